@@ -0,0 +1,86 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import groupby
+from operator import attrgetter
+
+from model_objects import Product, SpecialOfferType
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class LineItem:
+    def __init__(self, transaction_id: str, product_name: str, quantity: float):
+        self.transaction_id = transaction_id
+        self.product_name = product_name
+        self.quantity = quantity
+
+
+def read_line_items(path: str) -> Iterator[LineItem]:
+    """Lazily read POS line items from a ``.csv`` or ``.jsonl`` file.
+
+    Both formats use the fields ``transaction_id``, ``name`` and ``quantity``.
+    """
+    with open(path, newline='', encoding='utf-8') as lines:
+        if path.endswith('.jsonl'):
+            records = (json.loads(line) for line in lines if line.strip())
+        elif path.endswith('.csv'):
+            records = csv.DictReader(lines)
+        else:
+            raise ValueError(f"unsupported line item file: {path}")
+        for record in records:
+            yield LineItem(str(record['transaction_id']), record['name'], float(record['quantity']))
+
+
+def read_offers(path: str, products: Mapping[str, Product]) -> Iterator[tuple[SpecialOfferType, Product | list[Product], float]]:
+    """Read offers from a ``.jsonl`` file, as arguments for ``Teller.add_special_offer``.
+
+    Each record has the fields ``type`` (a SpecialOfferType name), ``products`` (a list of
+    product names) and ``argument``. Bundles take all their products, other offers exactly one.
+    """
+    with open(path, encoding='utf-8') as lines:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            offer_type = SpecialOfferType[record['type']]
+            names = record['products']
+            unknown = [name for name in names if name not in products]
+            if unknown:
+                raise ValueError(f"{path}:{number}: unknown products {unknown}")
+            if offer_type == SpecialOfferType.BUNDLE:
+                yield offer_type, [products[name] for name in names], float(record['argument'])
+            elif len(names) == 1:
+                yield offer_type, products[names[0]], float(record['argument'])
+            else:
+                raise ValueError(f"{path}:{number}: a {offer_type.name} offer takes exactly one product")
+
+
+def carts_from_line_items(line_items: Iterable[LineItem], products: Mapping[str, Product]) -> Iterator[tuple[str, ShoppingCart]]:
+    """Group consecutive line items of the same transaction into shopping carts.
+
+    Only one cart is held in memory at a time, so the lines of a transaction must be adjacent,
+    as they are in POS exports.
+    """
+    for transaction_id, items in groupby(line_items, key=attrgetter('transaction_id')):
+        cart = ShoppingCart()
+        for item in items:
+            if item.product_name not in products:
+                raise ValueError(f"transaction {transaction_id}: unknown product {item.product_name!r}")
+            cart.add_item_quantity(products[item.product_name], item.quantity)
+        yield transaction_id, cart
+
+
+def checkout_stream(teller: Teller, carts: Iterable[tuple[str, ShoppingCart]]) -> Iterator[tuple[str, Receipt]]:
+    for transaction_id, cart in carts:
+        yield transaction_id, teller.checks_out_articles_from(cart)
+
+
+def totals_stream(teller: Teller, carts: Iterable[tuple[str, ShoppingCart]]) -> Iterator[tuple[str, float]]:
+    for transaction_id, cart in carts:
+        yield transaction_id, teller.checks_out_articles_from(cart).total_price()
+
+
+def receipts_from_file(teller: Teller, path: str, products: Mapping[str, Product]) -> Iterator[tuple[str, Receipt]]:
+    return checkout_stream(teller, carts_from_line_items(read_line_items(path), products))
@@ -0,0 +1,205 @@
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+
+from catalog import SupermarketCatalog
+from model_objects import Offer, Product, SpecialOfferType
+from money import CENTS_PER_UNIT, MILLIS_PER_UNIT, to_cents
+from offer_rules import is_built_in_rule
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+
+# offer type -> number of items the bulk price applies to
+_BULK_SIZES = {
+    SpecialOfferType.THREE_FOR_TWO: 3,
+    SpecialOfferType.TWO_FOR_AMOUNT: 2,
+    SpecialOfferType.FIVE_FOR_AMOUNT: 5,
+}
+_PERCENT_OFF_BASIS_POINTS = 1000
+_BUNDLE_PERCENT_OFF = 10
+
+
+class BatchCheckoutResult:
+    """Per-cart amounts of a batch checkout, indexed like the carts that were passed in.
+
+    Amounts are kept in whole cents, the ``*_amounts`` and ``total_prices`` arrays convert them like
+    the corresponding Receipt methods do.
+    """
+
+    def __init__(self, item_cents: np.ndarray, discount_cents: np.ndarray, discount_counts: np.ndarray):
+        self.item_cents = item_cents
+        self.discount_cents = discount_cents
+        self.discount_counts = discount_counts
+
+    def __len__(self) -> int:
+        return len(self.item_cents)
+
+    @property
+    def item_amounts(self) -> np.ndarray:
+        return self.item_cents / CENTS_PER_UNIT
+
+    @property
+    def discount_amounts(self) -> np.ndarray:
+        return self.discount_cents / CENTS_PER_UNIT
+
+    @property
+    def total_prices(self) -> np.ndarray:
+        return (self.item_cents + self.discount_cents) / CENTS_PER_UNIT
+
+    @classmethod
+    def from_receipts(cls, receipts: Iterable[Receipt]) -> 'BatchCheckoutResult':
+        receipts = list(receipts)
+        return cls(np.array([receipt.total_item_price_cents() for receipt in receipts], dtype=np.int64),
+                   np.array([receipt.total_discount_cents() for receipt in receipts], dtype=np.int64),
+                   np.array([len(receipt.discounts) for receipt in receipts], dtype=np.intp))
+
+
+def supports_offers(offers: Iterable[Offer]) -> bool:
+    """Whether every offer has a vectorized implementation, rules registered by users have not."""
+    return all(offer.offer_type == SpecialOfferType.BUNDLE or is_built_in_rule(offer.offer_type) for offer in offers)
+
+
+def checkout_many(catalog: SupermarketCatalog, offers: Mapping[Offer, Product | list[Product]],
+                  carts: Iterable[ShoppingCart]) -> BatchCheckoutResult:
+    """Price many carts at once with the same rules as Teller.checks_out_articles_from.
+
+    Cart lines are packed into columns (cart id, product id, quantity, unit price) and every offer
+    is evaluated as an array operation over all carts. Amounts are computed in integer cents with
+    the rounding rules of money, so the results are identical to the scalar path.
+    """
+    product_ids: dict[Product, int] = {}
+    cart_column: list[int] = []
+    product_column: list[int] = []
+    quantity_column: list[float] = []
+    cart_count = 0
+    for cart_id, cart in enumerate(carts):
+        cart_count = cart_id + 1
+        for product_quantity in cart.items:
+            cart_column.append(cart_id)
+            product_column.append(product_ids.setdefault(product_quantity.product, len(product_ids)))
+            quantity_column.append(product_quantity.quantity)
+
+    prices = catalog.unit_prices(product_ids)
+    unit_prices = np.array([to_cents(prices[product]) for product in product_ids], dtype=np.int64)
+    line_carts = np.array(cart_column, dtype=np.intp)
+    line_products = np.array(product_column, dtype=np.intp)
+    line_quantities = np.array(quantity_column, dtype=float)
+
+    # money.line_cents, voided lines round like the lines they cancel
+    line_cents = np.sign(line_quantities).astype(np.int64) * _divide_cents(
+        _to_millis(np.abs(line_quantities)) * unit_prices[line_products], MILLIS_PER_UNIT)
+    item_cents = _sum_by_cart(line_carts, line_cents, cart_count)
+
+    # total quantity per (cart, product), like ShoppingCart.product_quantities
+    line_keys = line_carts * max(len(product_ids), 1) + line_products
+    pair_keys, line_pairs = np.unique(line_keys, return_inverse=True)
+    pair_quantities = np.bincount(line_pairs, weights=line_quantities, minlength=len(pair_keys))
+    pair_carts = pair_keys // max(len(product_ids), 1)
+    pair_products = pair_keys % max(len(product_ids), 1)
+    pairs = _PairsByProduct(pair_products)
+
+    same_product = _same_product_discounts(offers, product_ids, pairs, pair_carts, pair_quantities, unit_prices)
+    bundles = _bundle_discounts(offers, product_ids, unit_prices, pairs, pair_carts, pair_quantities)
+    discount_carts, discount_cents = (np.concatenate(columns) for columns in zip(same_product, bundles))
+    return BatchCheckoutResult(
+        item_cents,
+        _sum_by_cart(discount_carts, discount_cents, cart_count),
+        np.bincount(discount_carts, minlength=cart_count),
+    )
+
+
+def _to_millis(quantities: np.ndarray) -> np.ndarray:
+    # money.to_millis
+    return np.floor(quantities * MILLIS_PER_UNIT + 0.5).astype(np.int64)
+
+
+def _divide_cents(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    # money.divide_cents
+    return -((denominator - 2 * numerator) // (2 * denominator))
+
+
+def _sum_by_cart(carts: np.ndarray, cents: np.ndarray, cart_count: int) -> np.ndarray:
+    # float64 sums of integers are exact below 2**53 cents
+    return np.rint(np.bincount(carts, weights=cents, minlength=cart_count)).astype(np.int64)
+
+
+class _PairsByProduct:
+    """Joins (cart, product) pairs to anything keyed by product id."""
+
+    def __init__(self, pair_products: np.ndarray):
+        self.order = np.argsort(pair_products, kind='stable')
+        self.sorted_products = pair_products[self.order]
+
+    def join(self, product_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # returns (row in product_ids, pair) for every pair holding that product
+        low = np.searchsorted(self.sorted_products, product_ids, side='left')
+        counts = np.searchsorted(self.sorted_products, product_ids, side='right') - low
+        rows = np.repeat(np.arange(len(product_ids)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return rows, self.order[np.repeat(low, counts) + offsets]
+
+
+def _same_product_discounts(offers, product_ids, pairs, pair_carts, pair_quantities, unit_prices):
+    offer_products, bulk_sizes, amounts, three_for_two = [], [], [], []
+    for offer in offers:
+        product = offer.product
+        if not isinstance(product, Product) or product not in product_ids:
+            continue
+        if offer.offer_type in _BULK_SIZES:
+            bulk_sizes.append(_BULK_SIZES[offer.offer_type])
+        elif offer.offer_type == SpecialOfferType.TEN_PERCENT_DISCOUNT:
+            bulk_sizes.append(0)
+        else:
+            continue
+        offer_products.append(product_ids[product])
+        amounts.append(to_cents(offer.argument) if offer.offer_type in _BULK_SIZES else 0)
+        three_for_two.append(offer.offer_type == SpecialOfferType.THREE_FOR_TWO)
+    offer_products = np.array(offer_products, dtype=np.intp)
+    rows, row_pairs = pairs.join(offer_products)
+
+    millis = _to_millis(pair_quantities[row_pairs])
+    unit_price = unit_prices[offer_products[rows]]
+    bulk = np.array(bulk_sizes, dtype=np.int64)[rows]
+
+    # offer_rules.calculate_bulk_purchase_discount
+    amount = np.where(np.array(three_for_two, dtype=bool)[rows], 2 * unit_price, np.array(amounts, dtype=np.int64)[rows])
+    bulks = millis // (np.where(bulk > 0, bulk, 1) * MILLIS_PER_UNIT)
+    bulk_discount = bulks * (amount - bulk * unit_price)
+    # offer_rules.calculate_discount_x_percent
+    percent_discount = _divide_cents(-millis * unit_price * _PERCENT_OFF_BASIS_POINTS, MILLIS_PER_UNIT * 100 * 100)
+
+    discount = np.where(bulk > 0, bulk_discount, percent_discount)
+    applied = discount != 0
+    return pair_carts[row_pairs][applied], discount[applied]
+
+
+def _bundle_discounts(offers, product_ids, unit_prices, pairs, pair_carts, pair_quantities):
+    bundle_sizes, bundle_prices, members, member_bundles = [], [], [], []
+    for offer in offers:
+        products = offer.product
+        if offer.offer_type != SpecialOfferType.BUNDLE or isinstance(products, Product):
+            continue
+        if not products or any(product not in product_ids for product in products):
+            continue
+        bundle = len(bundle_sizes)
+        bundle_sizes.append(len(products))
+        bundle_prices.append(sum(int(unit_prices[product_ids[product]]) for product in products))
+        members.extend(product_ids[product] for product in products)
+        member_bundles.extend(bundle for _ in products)
+    rows, row_pairs = pairs.join(np.array(members, dtype=np.intp))
+    row_bundles = np.array(member_bundles, dtype=np.intp)[rows]
+
+    # one group per (cart, bundle); a bundle is complete when every member is in the cart
+    group_keys, row_groups, members_present = np.unique(
+        pair_carts[row_pairs] * max(len(bundle_sizes), 1) + row_bundles, return_inverse=True, return_counts=True)
+    minimum_quantity = np.full(len(group_keys), np.inf)
+    np.minimum.at(minimum_quantity, row_groups, pair_quantities[row_pairs])
+    group_carts = group_keys // max(len(bundle_sizes), 1)
+    group_bundles = group_keys % max(len(bundle_sizes), 1)
+    complete = np.where(members_present == np.array(bundle_sizes, dtype=np.intp)[group_bundles],
+                        np.trunc(minimum_quantity), 0).astype(np.int64)
+
+    # ShoppingCart.calculate_bundle_discount
+    discount = _divide_cents(-complete * np.array(bundle_prices, dtype=np.int64)[group_bundles] * _BUNDLE_PERCENT_OFF, 100)
+    applied = complete != 0
+    return group_carts[applied], discount[applied]
@@ -0,0 +1,46 @@
+"""Sustained async checkouts per second against a catalog with a simulated network round trip.
+
+Every price lookup sleeps ``LATENCY`` seconds. Carts are checked out ``CONCURRENT_CHECKOUTS`` at a
+time for increasing connection pool sizes; a pool of one awaits the lookups one at a time, as the
+blocking catalog would. Run from the python directory with ``python -m benchmarks.bench_async_checkout``.
+"""
+import asyncio
+import time
+
+from benchmarks.bench_checkout_many import build
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeAsyncCatalog
+
+LATENCY = 0.002
+CARTS = 200
+CONCURRENT_CHECKOUTS = 50
+
+
+async def checkout_all(teller: Teller, carts: list[ShoppingCart], concurrent: int) -> float:
+    queue = list(reversed(carts))
+
+    async def checkout_lane():
+        while queue:
+            await teller.checks_out_articles_from_async(queue.pop())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(checkout_lane() for _ in range(concurrent)))
+    return time.perf_counter() - start
+
+
+def main():
+    teller, carts = build()
+    catalog, carts = teller.catalog, carts[:CARTS]
+    lines = sum(len(cart.product_quantities) for cart in carts)
+    print(f"{len(carts)} carts, {lines / len(carts):.1f} products per cart, {LATENCY * 1000:.0f} ms per lookup")
+    for concurrent, pool in [(1, 1), (1, 32), (CONCURRENT_CHECKOUTS, 8), (CONCURRENT_CHECKOUTS, 32),
+                             (CONCURRENT_CHECKOUTS, 128), (CONCURRENT_CHECKOUTS, 512)]:
+        teller.catalog = FakeAsyncCatalog(catalog, LATENCY, pool)
+        seconds = asyncio.run(checkout_all(teller, carts, concurrent))
+        print(f"{concurrent:>3} checkouts, pool of {pool:>3}: {len(carts) / seconds:8.0f} checkouts/s,"
+              f" at most {teller.catalog.max_in_flight} lookups in flight")
+
+
+if __name__ == "__main__":
+    main()
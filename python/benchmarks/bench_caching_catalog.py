@@ -0,0 +1,66 @@
+"""Checkout throughput with and without a CachingCatalog in front of a slow catalog.
+
+Run from the python directory with ``python -m benchmarks.bench_caching_catalog``.
+"""
+import random
+import time
+
+from caching_catalog import CachingCatalog
+from catalog import SupermarketCatalog
+from model_objects import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+PRODUCT_COUNT = 500
+CART_COUNT = 1_000
+CART_LINES = 15
+LATENCY = 0.0005
+
+
+class SlowCatalog(FakeCatalog):
+    """FakeCatalog that pays a simulated database round trip per call."""
+
+    def unit_price(self, product: Product) -> float:
+        time.sleep(LATENCY)
+        return super().unit_price(product)
+
+    def unit_prices(self, products):
+        time.sleep(LATENCY)
+        return {product: super(SlowCatalog, self).unit_price(product) for product in products}
+
+
+def carts(products: list[Product]) -> list[ShoppingCart]:
+    rng = random.Random(42)
+    # a skewed popularity distribution, as in real baskets
+    weights = [1 / (rank + 1) for rank in range(len(products))]
+    result = []
+    for _ in range(CART_COUNT):
+        cart = ShoppingCart()
+        for product in rng.choices(products, weights, k=CART_LINES):
+            cart.add_item(product)
+        result.append(cart)
+    return result
+
+
+def throughput(catalog: SupermarketCatalog, baskets: list[ShoppingCart]) -> float:
+    teller = Teller(catalog)
+    start = time.perf_counter()
+    for cart in baskets:
+        teller.checks_out_articles_from(cart)
+    return len(baskets) / (time.perf_counter() - start)
+
+
+def main():
+    slow = SlowCatalog()
+    products = [Product(f"product-{i}", ProductUnit.EACH) for i in range(PRODUCT_COUNT)]
+    for i, product in enumerate(products):
+        slow.add_product(product, 1 + i % 50 / 10)
+    baskets = carts(products)
+    cached = CachingCatalog(slow, max_size=PRODUCT_COUNT)
+    print(f"uncached: {throughput(slow, baskets):8.0f} checkouts/s")
+    print(f"cached:   {throughput(cached, baskets):8.0f} checkouts/s  {cached.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""CheckoutCache against plain checkouts when the same baskets are priced over and over.
+
+A promotion simulation replays draws from a pool of distinct baskets, some far more frequent than
+others; the cost of a hit is the cart fingerprint and one dict lookup. Run from the python
+directory with ``python -m benchmarks.bench_checkout_cache``.
+"""
+import random
+import timeit
+
+from benchmarks.data import SyntheticStore, build_teller, generate_baskets, generate_offers
+from checkout_cache import CheckoutCache, cart_fingerprint
+
+DRAWS = 20_000
+POOL_SIZES = [100, 2_000, 20_000]
+
+
+def main():
+    store = SyntheticStore(10_000)
+    rng = random.Random(1)
+    teller = build_teller(store, generate_offers(store, rng, bundle_count=100, popular=500))
+    for pool_size in POOL_SIZES:
+        pool = list(generate_baskets(store, pool_size, rng))
+        draws = rng.choices(pool, weights=[1 / (rank + 1) for rank in range(pool_size)], k=DRAWS)
+        plain = min(timeit.repeat(lambda: [teller.checks_out_articles_from(cart).total_price_cents() for cart in draws], number=1, repeat=3))
+        caches = []
+
+        def cached():
+            cache = CheckoutCache(teller, max_size=5_000)
+            caches.append(cache)
+            return [cache.total_price_cents(cart) for cart in draws]
+        memoized = min(timeit.repeat(cached, number=1, repeat=3))
+        print(f"{pool_size:>6} distinct baskets: plain {DRAWS / plain:8.0f} carts/s, cached {DRAWS / memoized:8.0f} carts/s,"
+              f" hit rate {caches[-1].hit_rate:.1%}, {caches[-1].evictions} evictions")
+    fingerprint = min(timeit.repeat(lambda: [cart_fingerprint(cart) for cart in draws], number=1, repeat=3)) / DRAWS
+    print(f"fingerprint: {fingerprint * 1e6:.2f} us per cart of {sum(len(cart.items) for cart in draws) / DRAWS:.1f} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Scalar checkout loop versus Teller.checkout_many over many historical baskets.
+
+Run from the python directory with ``python -m benchmarks.bench_checkout_many``.
+"""
+import random
+import time
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+PRODUCT_COUNT = 5_000
+OFFER_COUNT = 1_000
+CART_COUNT = 100_000
+CART_LINES = 12
+
+
+def build(seed: int = 1) -> tuple[Teller, list[ShoppingCart]]:
+    rng = random.Random(seed)
+    catalog = FakeCatalog()
+    teller = Teller(catalog)
+    products = [Product(f"product-{i}", ProductUnit.EACH) for i in range(PRODUCT_COUNT)]
+    for product in products:
+        catalog.add_product(product, round(rng.uniform(0.2, 20), 2))
+    offer_types = [SpecialOfferType.THREE_FOR_TWO, SpecialOfferType.TEN_PERCENT_DISCOUNT,
+                   SpecialOfferType.TWO_FOR_AMOUNT, SpecialOfferType.FIVE_FOR_AMOUNT]
+    for product in rng.sample(products, OFFER_COUNT):
+        teller.add_special_offer(rng.choice(offer_types), product, round(rng.uniform(1, 10), 2))
+    for _ in range(OFFER_COUNT // 10):
+        teller.add_special_offer(SpecialOfferType.BUNDLE, rng.sample(products[:200], 2), 10)
+    carts = []
+    for _ in range(CART_COUNT):
+        cart = ShoppingCart()
+        for product in rng.choices(products[:1_000], k=CART_LINES):
+            cart.add_item_quantity(product, rng.randint(1, 4))
+        carts.append(cart)
+    return teller, carts
+
+
+def main():
+    teller, carts = build()
+    start = time.perf_counter()
+    totals = [teller.checks_out_articles_from(cart).total_price() for cart in carts]
+    scalar = time.perf_counter() - start
+    start = time.perf_counter()
+    result = teller.checkout_many(carts)
+    batch = time.perf_counter() - start
+    assert list(result.total_prices) == totals
+    print(f"scalar loop:   {len(carts) / scalar:10.0f} carts/s")
+    print(f"checkout_many: {len(carts) / batch:10.0f} carts/s")
+
+
+if __name__ == "__main__":
+    main()
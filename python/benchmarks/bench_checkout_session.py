@@ -0,0 +1,32 @@
+"""Per-scan latency of a CheckoutSession versus re-running the full checkout after every scan.
+
+Run from the python directory with ``python -m benchmarks.bench_checkout_session``.
+"""
+import time
+
+from benchmarks.bench_offer_index import build_teller
+from checkout_session import CheckoutSession
+
+BASKET_SIZES = [10, 50, 200, 1_000]
+
+
+def main():
+    teller, products = build_teller(2_000)
+    print(f"{'basket':>7} {'session (us/scan)':>18} {'full checkout (us/scan)':>24}")
+    for size in BASKET_SIZES:
+        session = CheckoutSession(teller)
+        start = time.perf_counter()
+        for product in products[:size]:
+            session.scan(product)
+        incremental = (time.perf_counter() - start) / size
+        session = CheckoutSession(teller)
+        start = time.perf_counter()
+        for product in products[:size]:
+            session.cart.add_item(product)
+            teller.checks_out_articles_from(session.cart)
+        full = (time.perf_counter() - start) / size
+        print(f"{size:>7} {incremental * 1e6:>18.1f} {full * 1e6:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Worker startup time and memory of MappedCatalog versus building a FakeCatalog from a price csv.
+
+Each catalog is opened in a fresh interpreter, as a pricing worker would, which then prices a
+sample of products. Anonymous memory is what every worker pays for itself; the mapped file pages
+in the resident set live in the page cache and are shared by all workers on the host. Run from
+the python directory with ``python -m benchmarks.bench_mapped_catalog``.
+"""
+import csv
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from mapped_catalog import MappedCatalog, read_price_csv, write_catalog
+from model_objects import Product, ProductUnit
+from tests.fake_catalog import FakeCatalog
+
+SIZES = [10_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+
+
+def write_prices(path: str, count: int) -> None:
+    rng = random.Random(count)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', 'unit', 'price'])
+        for i in range(count):
+            writer.writerow([f"product-{i:07d}", 'KILO' if i % 4 == 0 else 'EACH', round(rng.uniform(0.2, 20), 2)])
+
+
+def memory_kib() -> dict[str, int]:
+    with open('/proc/self/smaps_rollup') as smaps:
+        fields = dict(line.split(':', 1) for line in smaps if ':' in line and not line.startswith(' '))
+    return {name: int(fields[name].split()[0]) for name in ('Rss', 'Anonymous')}
+
+
+def worker(kind: str, path: str, count: int) -> None:
+    start = time.perf_counter()
+    if kind == 'fake':
+        catalog = FakeCatalog()
+        for product, price in read_price_csv(path):
+            catalog.add_product(product, price)
+    else:
+        catalog = MappedCatalog(path)
+    startup = time.perf_counter() - start
+    rng = random.Random(1)
+    products = [Product(f"product-{i:07d}", ProductUnit.EACH) for i in rng.choices(range(count), k=LOOKUPS)]
+    start = time.perf_counter()
+    for product in products:
+        catalog.unit_price(product)
+    lookup = (time.perf_counter() - start) / LOOKUPS
+    memory = memory_kib()
+    print(f"{kind:>6}: startup {startup * 1000:8.1f} ms, lookup {lookup * 1e9:5.0f} ns,"
+          f" rss {memory['Rss'] / 1024:6.1f} MiB, anonymous {memory['Anonymous'] / 1024:6.1f} MiB")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in SIZES:
+            prices = os.path.join(directory, f"prices-{count}.csv")
+            catalog = os.path.join(directory, f"catalog-{count}.smc")
+            write_prices(prices, count)
+            start = time.perf_counter()
+            write_catalog(catalog, read_price_csv(prices))
+            print(f"{count} products: wrote {os.path.getsize(catalog) / 2**20:.1f} MiB in {time.perf_counter() - start:.1f} s")
+            for kind, path in (('fake', prices), ('mapped', catalog)):
+                subprocess.run([sys.executable, '-m', 'benchmarks.bench_mapped_catalog', kind, path, str(count)], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        worker(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
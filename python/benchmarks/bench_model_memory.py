@@ -0,0 +1,42 @@
+"""Memory held by one million receipt lines, slotted value objects versus plain classes.
+
+Run from the python directory with ``python -m benchmarks.bench_model_memory``.
+"""
+import tracemalloc
+
+from model_objects import ProductRegistry, ProductUnit
+from receipt import ReceiptItem
+
+LINES = 1_000_000
+SKUS = 10_000
+
+
+class DictReceiptItem:
+    """The receipt line layout before the model objects were slotted."""
+
+    def __init__(self, product, quantity, price, total_price):
+        self.product = product
+        self.quantity = quantity
+        self.price = price
+        self.total_price = total_price
+
+
+def measure(item_class, products) -> int:
+    tracemalloc.start()
+    lines = [item_class(products[i % SKUS], 2.0, 1.5, 3.0) for i in range(LINES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del lines
+    return size
+
+
+def main():
+    registry = ProductRegistry()
+    products = [registry.product(f"product-{i}", ProductUnit.EACH) for i in range(SKUS)]
+    for item_class in (DictReceiptItem, ReceiptItem):
+        size = measure(item_class, products)
+        print(f"{item_class.__name__:>16}: {size / 2**20:7.1f} MiB, {size / LINES:5.1f} bytes/line")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Integer-cents pricing versus the float arithmetic it replaced, on counted and weighed items.
+
+Receipt lines are priced both ways in the same process, alternating runs and keeping the best of
+each, because timings on shared machines drift by more than the difference being measured. Both
+read prices from the same snapshots, which hold the float and the cents prices once they are made. The
+end-to-end numbers only use the public Teller API, so the script can also be run against an older
+checkout of the repository. Run from the python directory with ``python -m benchmarks.bench_money``.
+"""
+import random
+import time
+from typing import NamedTuple
+
+from catalog import PriceSnapshot
+from model_objects import Product, ProductQuantity, ProductUnit, SpecialOfferType
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+PRODUCT_COUNT = 2_000
+CART_COUNT = 5_000
+ROUNDS = 30
+
+
+class FloatReceiptItem(NamedTuple):
+    product: Product
+    quantity: float
+    price: float
+    total_price: float
+
+
+class FloatReceipt:
+    """Receipt lines as they were priced before money, kept as the reference."""
+
+    def __init__(self) -> None:
+        self.items: list[FloatReceiptItem] = []
+        self.total_item_price = 0
+
+    def add_cart_item_to_receipt(self, catalog: PriceSnapshot, product_quantity: ProductQuantity):
+        product = product_quantity.product
+        quantity = product_quantity.quantity
+        unit_price = catalog.unit_price(product)
+        price = quantity * unit_price
+        self.add_product(product, quantity, unit_price, price)
+
+    def add_product(self, product: Product, quantity: float, price: float, total_price: float):
+        self.items.append(FloatReceiptItem(product, quantity, price, total_price))
+        self.total_item_price += total_price
+
+
+def build_teller(rng: random.Random) -> tuple[Teller, list[Product]]:
+    catalog = FakeCatalog()
+    teller = Teller(catalog)
+    products = [Product(f"product-{i}", ProductUnit.KILO if i % 4 == 0 else ProductUnit.EACH) for i in range(PRODUCT_COUNT)]
+    for product in products:
+        catalog.add_product(product, round(rng.uniform(0.2, 20), 2))
+    for product in rng.sample(products, PRODUCT_COUNT // 5):
+        offer_type = rng.choice([SpecialOfferType.THREE_FOR_TWO, SpecialOfferType.TWO_FOR_AMOUNT,
+                                 SpecialOfferType.FIVE_FOR_AMOUNT, SpecialOfferType.TEN_PERCENT_DISCOUNT])
+        teller.add_special_offer(offer_type, product, round(catalog.unit_price(product) * 1.5, 2))
+    for _ in range(PRODUCT_COUNT // 20):
+        teller.add_special_offer(SpecialOfferType.BUNDLE, rng.sample(products, rng.randint(2, 3)), 10)
+    return teller, products
+
+
+def random_carts(rng: random.Random, products: list[Product]) -> list[ShoppingCart]:
+    carts = []
+    for _ in range(CART_COUNT):
+        cart = ShoppingCart()
+        for product in rng.sample(products, rng.randint(1, 30)):
+            if product.unit == ProductUnit.KILO:
+                cart.add_item_quantity(product, round(rng.uniform(0.1, 3), 3))
+            else:
+                cart.add_item_quantity(product, rng.randint(1, 6))
+        carts.append(cart)
+    return carts
+
+
+def best_times(functions: dict) -> dict[str, float]:
+    best = dict.fromkeys(functions, float('inf'))
+    for _ in range(ROUNDS):
+        for name, function in functions.items():
+            start = time.perf_counter()
+            function()
+            best[name] = min(best[name], time.perf_counter() - start)
+    return best
+
+
+def compare_line_pricing(teller: Teller, carts: list[ShoppingCart]):
+    snapshots = [teller.price_snapshot(cart) for cart in carts]
+
+    def float_lines():
+        for cart, prices in zip(carts, snapshots):
+            receipt = FloatReceipt()
+            for product_quantity in cart.items:
+                receipt.add_cart_item_to_receipt(prices, product_quantity)
+
+    def cents_lines():
+        for cart, prices in zip(carts, snapshots):
+            Receipt().add_cart_items_to_receipt(prices, cart.items)
+
+    lines = sum(len(cart.items) for cart in carts)
+    for name, seconds in best_times({'float lines': float_lines, 'cents lines': cents_lines}).items():
+        print(f"{name}:     {seconds / lines * 1e9:6.0f} ns/line")
+
+
+def main():
+    rng = random.Random(13)
+    teller, products = build_teller(rng)
+    carts = random_carts(rng, products)
+    compare_line_pricing(teller, carts)
+    checkouts = best_times({'scalar checkout': lambda: [teller.checks_out_articles_from(cart) for cart in carts],
+                            'batch checkout': lambda: teller.checkout_many(carts)})
+    for name, seconds in checkouts.items():
+        print(f"{name}: {CART_COUNT / seconds:9.0f} carts/s")
+
+    receipts = [teller.checks_out_articles_from(cart) for cart in carts]
+    exact = sum(receipt.total_price_cents() for receipt in receipts)
+    summed = sum(receipt.total_price() for receipt in receipts)
+    print(f"{CART_COUNT} receipts: {exact} cents exactly, float sum of totals off by {summed * 100 - exact:.2e} cents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Checkout latency of OfferAllocator on baskets where most offers compete for the same items.
+
+Run from the python directory with ``python -m benchmarks.bench_offer_allocation``.
+"""
+import random
+import time
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_allocation import OfferAllocator
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+PRODUCT_COUNT = 150
+CART_COUNT = 50
+BUDGETS = [0.001, 0.005, 0.05]
+
+
+def adversarial_teller(rng: random.Random) -> tuple[Teller, list[Product]]:
+    catalog = FakeCatalog()
+    teller = Teller(catalog)
+    products = [Product(f"product-{i}", ProductUnit.EACH) for i in range(PRODUCT_COUNT)]
+    for product in products:
+        catalog.add_product(product, round(rng.uniform(0.5, 5), 2))
+    bulk_types = [SpecialOfferType.THREE_FOR_TWO, SpecialOfferType.TWO_FOR_AMOUNT, SpecialOfferType.FIVE_FOR_AMOUNT]
+    for product in products:
+        teller.add_special_offer(rng.choice(bulk_types), product, round(catalog.unit_price(product) * rng.uniform(1.2, 3.5), 2))
+        if rng.random() < 0.3:
+            teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, product, 10)
+    # every product in about three overlapping bundles
+    for _ in range(PRODUCT_COUNT):
+        teller.add_special_offer(SpecialOfferType.BUNDLE, rng.sample(products, rng.randint(2, 4)), 10)
+    return teller, products
+
+
+def main():
+    rng = random.Random(11)
+    teller, products = adversarial_teller(rng)
+    carts = []
+    for _ in range(CART_COUNT):
+        cart = ShoppingCart()
+        for product in rng.sample(products, 120):
+            cart.add_item_quantity(product, rng.randint(1, 7))
+        carts.append(cart)
+    stacked = sum(teller.checks_out_articles_from(cart).total_discount_amount() for cart in carts)
+    print(f"stacked offers (double counting): {-stacked:10.2f} saved")
+    for budget in BUDGETS:
+        teller.offer_allocator = OfferAllocator(time_budget=budget)
+        start = time.perf_counter()
+        saved = -sum(teller.checks_out_articles_from(cart).total_discount_amount() for cart in carts)
+        elapsed = (time.perf_counter() - start) / CART_COUNT
+        print(f"budget {budget * 1000:5.1f} ms: {elapsed * 1000:6.2f} ms/checkout, {saved:10.2f} saved, "
+              f"{teller.offer_allocator.budget_exceeded}/{CART_COUNT} out of time")
+
+
+if __name__ == "__main__":
+    main()
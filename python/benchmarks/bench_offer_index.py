@@ -0,0 +1,45 @@
+"""Checkout latency as the number of registered offers grows.
+
+Run from the python directory with ``python -m benchmarks.bench_offer_index``.
+"""
+import timeit
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+OFFER_COUNTS = [10, 100, 1_000, 10_000, 100_000]
+CART_LINES = 20
+REPEAT = 200
+
+
+def build_teller(offer_count: int) -> tuple[Teller, list[Product]]:
+    catalog = FakeCatalog()
+    teller = Teller(catalog)
+    products = []
+    for i in range(max(offer_count, CART_LINES)):
+        product = Product(f"product-{i}", ProductUnit.EACH)
+        catalog.add_product(product, 1.0 + i % 100 / 100)
+        products.append(product)
+    for i in range(offer_count):
+        if i % 10 == 9:
+            teller.add_special_offer(SpecialOfferType.BUNDLE, [products[i - 1], products[i]], 10)
+        else:
+            teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, products[i], 0)
+    return teller, products
+
+
+def main():
+    print(f"{'offers':>8} {'checkout (us)':>14}")
+    for offer_count in OFFER_COUNTS:
+        teller, products = build_teller(offer_count)
+        cart = ShoppingCart()
+        for product in products[:CART_LINES]:
+            cart.add_item_quantity(product, 3)
+        seconds = min(timeit.repeat(lambda: teller.checks_out_articles_from(cart), number=REPEAT, repeat=3))
+        print(f"{offer_count:>8} {seconds / REPEAT * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
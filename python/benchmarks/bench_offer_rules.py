@@ -0,0 +1,45 @@
+"""Compiled offer rules versus the if-chain they replaced in calculate_same_product_discount.
+
+Run from the python directory with ``python -m benchmarks.bench_offer_rules``.
+"""
+import timeit
+
+from model_objects import Discount, Offer, Product, ProductUnit, SpecialOfferType
+from money import to_cents
+from offer_rules import calculate_bulk_purchase_discount, calculate_discount_x_percent, compile_offer
+
+NUMBER = 200_000
+
+
+def if_chain_discount(product: Product, quantity: float, offer: Offer, unit_price_cents: int) -> Discount | None:
+    """The previous ShoppingCart.calculate_same_product_discount."""
+    discount_amount, description = None, None
+    if offer.offer_type == SpecialOfferType.THREE_FOR_TWO:
+        discount_amount = calculate_bulk_purchase_discount(quantity, unit_price_cents, 3, 2 * unit_price_cents)
+        description = "3 for 2"
+    if offer.offer_type == SpecialOfferType.TWO_FOR_AMOUNT:
+        discount_amount = calculate_bulk_purchase_discount(quantity, unit_price_cents, 2, to_cents(offer.argument))
+        description = f"2 for {offer.argument}"
+    if offer.offer_type == SpecialOfferType.FIVE_FOR_AMOUNT:
+        discount_amount = calculate_bulk_purchase_discount(quantity, unit_price_cents, 5, to_cents(offer.argument))
+        description = f"5 for {offer.argument}"
+    if offer.offer_type == SpecialOfferType.TEN_PERCENT_DISCOUNT:
+        discount_amount = calculate_discount_x_percent(quantity, unit_price_cents, 10.0)
+        description = "10.0% off"
+    if discount_amount and description:
+        return Discount.from_cents(product, description, discount_amount)
+    return None
+
+
+def main():
+    product = Product("apples", ProductUnit.KILO)
+    for offer_type in [SpecialOfferType.THREE_FOR_TWO, SpecialOfferType.FIVE_FOR_AMOUNT, SpecialOfferType.TEN_PERCENT_DISCOUNT]:
+        offer = Offer(offer_type, product, 7.99)
+        compiled = compile_offer(offer)
+        chain = min(timeit.repeat(lambda: if_chain_discount(product, 6, offer, 199), number=NUMBER, repeat=3))
+        rule = min(timeit.repeat(lambda: compiled.discount(product, 6, 199), number=NUMBER, repeat=3))
+        print(f"{offer_type.name:>21}: if-chain {chain / NUMBER * 1e9:6.0f} ns, compiled {rule / NUMBER * 1e9:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Cost of offer table swaps, as-of lookups and as-of checkouts for growing numbers of retained versions.
+
+Every version is a day of promotions on a 10k product store, with windows overlapping by an hour.
+Run from the python directory with ``python -m benchmarks.bench_offer_tables``.
+"""
+import random
+import time
+import timeit
+
+from benchmarks.data import SyntheticStore, generate_baskets, generate_offers
+from offer_tables import OfferTable, OfferTableHistory
+from teller import Teller
+
+DAY = 24 * 60 * 60
+VERSION_COUNTS = [10, 100, 500]
+NUMBER = 100_000
+
+
+def main():
+    store = SyntheticStore(10_000)
+    rng = random.Random(1)
+    carts = list(generate_baskets(store, 1_000, rng))
+    rows = [generate_offers(store, rng, single_share=0.02, bundle_count=20) for _ in range(10)]
+    for count in VERSION_COUNTS:
+        history = OfferTableHistory(retain=count)
+        tables = [OfferTable.build(version, rows[version % len(rows)], version * DAY, (version + 1) * DAY + 3600) for version in range(count)]
+        start = time.perf_counter()
+        for table in tables:
+            history.publish(table)
+        publish = (time.perf_counter() - start) / count
+        teller = Teller(store.catalog)
+        teller.offer_history = history
+        timestamps = [rng.uniform(0, count * DAY) for _ in range(1_000)]
+        as_of = min(timeit.repeat(lambda: [history.as_of(timestamp) for timestamp in timestamps], number=NUMBER // 1_000, repeat=5)) / NUMBER
+        swap = min(timeit.repeat(lambda: teller.swap_offer_table(tables[0]), number=NUMBER, repeat=5)) / NUMBER
+        teller.swap_offer_table(history.as_of(timestamps[0]))
+        current = min(timeit.repeat(lambda: [teller.checks_out_articles_from(cart) for cart in carts], number=1, repeat=5)) / len(carts)
+        historical = min(timeit.repeat(lambda: [teller.checks_out_articles_from(cart, timestamps[0]) for cart in carts], number=1, repeat=5)) / len(carts)
+        print(f"{count:>4} versions: publish {publish * 1e3:6.2f} ms, as_of {as_of * 1e9:5.0f} ns, swap {swap * 1e9:4.0f} ns,"
+              f" checkout {current * 1e6:5.1f} us, as of a timestamp {historical * 1e6:5.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Basket replay throughput of ParallelCheckout for increasing worker counts.
+
+Run from the python directory with ``python -m benchmarks.bench_parallel_checkout``.
+"""
+import multiprocessing
+import time
+
+from benchmarks.bench_checkout_many import build
+from parallel_checkout import ParallelCheckout
+
+
+def main():
+    teller, carts = build()
+    processes = 1
+    while processes <= multiprocessing.cpu_count():
+        runner = ParallelCheckout(teller, processes=processes, chunk_size=512, min_parallel_carts=1)
+        start = time.perf_counter()
+        for _ in runner.totals(carts):
+            pass
+        print(f"{processes:>3} processes: {len(carts) / (time.perf_counter() - start):10.0f} carts/s")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Size and throughput of the binary receipt encoding against HTML and JSON.
+
+Receipts come from checkouts of mixed baskets on a 10k product store. JSON holds what the printers
+show, with product names and amounts as strings. Run from the python directory with
+``python -m benchmarks.bench_receipt_codec``.
+"""
+import json
+import random
+import timeit
+import zlib
+
+from benchmarks.data import SyntheticStore, build_teller, generate_baskets, generate_offers
+from money import format_cents
+from receipt import Receipt
+from receipt_codec import ReceiptBatch, encode_receipts
+from receipt_printer import ReceiptPrinter
+
+RECEIPTS = 2_000
+
+
+def receipt_json(receipt: Receipt) -> dict:
+    return {
+        'items': [{'name': item.product.name, 'unit': item.product.unit.name, 'quantity': item.quantity,
+                   'price': format_cents(item.price_cents), 'total_price': format_cents(item.total_price_cents)} for item in receipt.items],
+        'discounts': [{'products': [discount.product.name] if hasattr(discount.product, 'name') else [product.name for product in discount.product],
+                       'description': discount.description, 'amount': format_cents(discount.discount_cents)} for discount in receipt.discounts],
+        'total': format_cents(receipt.total_price_cents()),
+    }
+
+
+def best(function) -> float:
+    return min(timeit.repeat(function, number=1, repeat=5)) / RECEIPTS
+
+
+def main():
+    store = SyntheticStore(10_000)
+    rng = random.Random(1)
+    teller = build_teller(store, generate_offers(store, rng, bundle_count=100, popular=500))
+    receipts = [teller.checks_out_articles_from(cart) for cart in generate_baskets(store, RECEIPTS, rng)]
+    lines = sum(len(receipt.items) + len(receipt.discounts) for receipt in receipts)
+    printer = ReceiptPrinter()
+
+    binary = encode_receipts(receipts)
+    html = '\n'.join(printer.print_receipt(receipt) for receipt in receipts).encode('utf-8')
+    text_json = '\n'.join(json.dumps(receipt_json(receipt)) for receipt in receipts).encode('utf-8')
+    print(f"{RECEIPTS} receipts, {lines / RECEIPTS:.1f} lines each, bytes per receipt (zlib compressed):")
+    for name, data in (('binary', binary), ('json', text_json), ('html', html)):
+        print(f"  {name:<8}{len(data) / RECEIPTS:8.0f}  ({len(zlib.compress(data)) / RECEIPTS:6.0f})")
+
+    print("encode, us per receipt:")
+    print(f"  binary  {best(lambda: encode_receipts(receipts)) * 1e6:8.1f}")
+    print(f"  json    {best(lambda: [json.dumps(receipt_json(receipt)) for receipt in receipts]) * 1e6:8.1f}")
+    print(f"  html    {best(lambda: [printer.print_receipt(receipt) for receipt in receipts]) * 1e6:8.1f}")
+
+    documents = text_json.split(b'\n')
+    print("decode, us per receipt:")
+    print(f"  binary totals  {best(lambda: sum(ReceiptBatch(binary).total_prices_cents())) * 1e6:8.2f}")
+    print(f"  binary lines   {best(lambda: [(list(r.items), list(r.discounts)) for r in ReceiptBatch(binary)]) * 1e6:8.2f}")
+    print(f"  json           {best(lambda: [json.loads(document) for document in documents]) * 1e6:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
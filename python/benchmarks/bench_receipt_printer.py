@@ -0,0 +1,46 @@
+"""Receipts rendered per second by the HTML and plain-text printers.
+
+Run from the python directory with ``python -m benchmarks.bench_receipt_printer``.
+"""
+import timeit
+
+from jinja2 import Environment, FileSystemLoader
+
+from model_objects import Discount, Product, ProductUnit
+from receipt import Receipt
+from receipt_printer import TEMPLATES_DIR, ReceiptPrinter, TextReceiptPrinter
+
+NUMBER = 2_000
+
+
+def sample_receipt(lines: int = 20) -> Receipt:
+    receipt = Receipt()
+    for i in range(lines):
+        product = Product(f"product-{i}", ProductUnit.KILO if i % 3 == 0 else ProductUnit.EACH)
+        receipt.add_product(product, 1 + i % 4, 1.99, (1 + i % 4) * 1.99)
+        if i % 5 == 0:
+            receipt.add_discount(Discount(product, "3 for 2", -1.99))
+    return receipt
+
+
+def uncached_printer_per_receipt(receipt: Receipt) -> str:
+    # what every caller paid before the template was cached: a new environment and a compile
+    printer = ReceiptPrinter.__new__(ReceiptPrinter)
+    printer.template = Environment(loader=FileSystemLoader(TEMPLATES_DIR)).get_template('receipt_template.html')
+    return printer.print_receipt(receipt)
+
+
+def main():
+    receipt = sample_receipt()
+    paths = {
+        "html, new environment per receipt": lambda: uncached_printer_per_receipt(receipt),
+        "html, cached template": lambda: ReceiptPrinter().print_receipt(receipt),
+        "plain text": lambda: TextReceiptPrinter().print_receipt(receipt),
+    }
+    for name, render in paths.items():
+        seconds = min(timeit.repeat(render, number=NUMBER, repeat=3))
+        print(f"{name:>34}: {NUMBER / seconds:10.0f} receipts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Synthetic catalogs, offer tables and baskets for the benchmark suite.
+
+Everything is generated from a seed, so the same arguments always produce the same data. Product
+popularity follows a Zipf-like curve, the way a few staples show up in most baskets.
+"""
+import random
+from collections.abc import Iterator
+from itertools import accumulate
+
+from model_objects import Product, ProductRegistry, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+SINGLE_PRODUCT_OFFERS = [SpecialOfferType.THREE_FOR_TWO, SpecialOfferType.TEN_PERCENT_DISCOUNT,
+                         SpecialOfferType.TWO_FOR_AMOUNT, SpecialOfferType.FIVE_FOR_AMOUNT]
+
+OfferRow = tuple[SpecialOfferType, Product | list[Product], float]
+
+
+class SyntheticStore:
+    """A catalog of ``sku_count`` products with their popularity, for drawing baskets."""
+
+    def __init__(self, sku_count: int, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.catalog = FakeCatalog()
+        self.registry = ProductRegistry()
+        # one product in five is sold by weight
+        self.products = [self.registry.product(f"sku-{i:07d}", ProductUnit.KILO if i % 5 == 0 else ProductUnit.EACH) for i in range(sku_count)]
+        for product in self.products:
+            self.catalog.add_product(product, round(rng.lognormvariate(1, 0.8), 2) or 0.01)
+        self.popularity = list(accumulate(1 / (rank + 1) for rank in range(sku_count)))
+
+
+def generate_offers(store: SyntheticStore, rng: random.Random, single_share: float = 0.1, bundle_count: int = 100,
+                    popular: int | None = None) -> list[OfferRow]:
+    """Offers on ``single_share`` of the products and ``bundle_count`` bundles of two to four products.
+
+    Bundles only combine the ``popular`` best sellers when given, so that baskets complete them.
+    """
+    products = store.products
+    offers: list[OfferRow] = []
+    for product in rng.sample(products, int(len(products) * single_share)):
+        offer_type = rng.choice(SINGLE_PRODUCT_OFFERS)
+        argument = rng.choice([10, 20, 25]) if offer_type == SpecialOfferType.TEN_PERCENT_DISCOUNT else round(store.catalog.unit_price(product) * 1.5, 2)
+        offers.append((offer_type, product, argument))
+    candidates = products[:popular] if popular else products
+    for _ in range(bundle_count):
+        offers.append((SpecialOfferType.BUNDLE, rng.sample(candidates, rng.randint(2, 4)), rng.choice([5, 10, 15])))
+    return offers
+
+
+def build_teller(store: SyntheticStore, offers: list[OfferRow]) -> Teller:
+    teller = Teller(store.catalog)
+    for offer_type, products, argument in offers:
+        teller.add_special_offer(offer_type, products, argument)
+    return teller
+
+
+def basket_size(rng: random.Random, distribution: str) -> int:
+    if distribution == 'express':
+        return rng.randint(1, 5)
+    if distribution == 'weekly':
+        return min(80, max(5, int(rng.lognormvariate(3.2, 0.4))))
+    if distribution == 'mixed':
+        return basket_size(rng, 'express' if rng.random() < 0.7 else 'weekly')
+    raise ValueError(f"unknown basket size distribution {distribution!r}")
+
+
+def generate_baskets(store: SyntheticStore, count: int, rng: random.Random, distribution: str = 'mixed') -> Iterator[ShoppingCart]:
+    """``count`` carts with sizes from ``distribution``: ``express``, ``weekly`` or ``mixed``."""
+    for _ in range(count):
+        cart = ShoppingCart()
+        for product in rng.choices(store.products, cum_weights=store.popularity, k=basket_size(rng, distribution)):
+            if product.unit == ProductUnit.KILO:
+                cart.add_item_quantity(product, round(rng.uniform(0.1, 3), 3))
+            else:
+                cart.add_item_quantity(product, 1 if rng.random() < 0.7 else rng.randint(2, 6))
+        yield cart
+
+
+def bundle_heavy_baskets(store: SyntheticStore, offers: list[OfferRow], count: int, rng: random.Random) -> Iterator[ShoppingCart]:
+    """Carts that complete several bundles each, on top of a few other products."""
+    bundles = [products for offer_type, products, _ in offers if offer_type == SpecialOfferType.BUNDLE]
+    for _ in range(count):
+        cart = ShoppingCart()
+        for products in rng.sample(bundles, min(len(bundles), rng.randint(3, 8))):
+            quantity = rng.randint(1, 3)
+            for product in products:
+                cart.add_item_quantity(product, quantity)
+        for product in rng.choices(store.products, cum_weights=store.popularity, k=rng.randint(1, 10)):
+            cart.add_item_quantity(product, 1)
+        yield cart
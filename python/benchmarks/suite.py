@@ -0,0 +1,193 @@
+"""Benchmark suite for checkout, offer evaluation and rendering, with regression checks against a baseline.
+
+Every case runs ``--samples`` times on synthetic data (see benchmarks.data) and reports the median
+time per operation. With ``--save-baseline`` the samples are stored; later runs compare against
+them and exit with status 1 when a case got slower by more than ``--threshold`` and a one-sided
+Mann-Whitney U test finds the slowdown significant. Baselines are only comparable on the machine
+and Python version that recorded them, so they are not committed.
+
+Run from the python directory with ``python -m benchmarks.suite``, see the README.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterator
+from math import erfc, sqrt
+from typing import NamedTuple
+
+from benchmarks.data import SyntheticStore, build_teller, bundle_heavy_baskets, generate_baskets, generate_offers
+from receipt import Receipt
+from receipt_printer import ReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.benchmarks', 'baseline.json')
+CARTS = 1_000
+RECEIPTS = 200
+ALPHA = 0.01
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    operations: int
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+    p_value: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def checkout_case(name: str, teller: Teller, carts: list[ShoppingCart]) -> Case:
+    return Case(name, lambda: [teller.checks_out_articles_from(cart) for cart in carts], len(carts))
+
+
+def receipt_totals_case(name: str, teller: Teller, carts: list[ShoppingCart]) -> Case:
+    # pricing the lines and totalling them, without the catalog round trip or offers
+    priced = [(teller.price_snapshot(cart), cart.items) for cart in carts]
+
+    def run():
+        for prices, items in priced:
+            receipt = Receipt()
+            receipt.add_cart_items_to_receipt(prices, items)
+            receipt.total_price()
+    return Case(name, run, len(carts))
+
+
+def html_render_case(name: str, receipts: list[Receipt]) -> Case:
+    printer = ReceiptPrinter()
+    return Case(name, lambda: [printer.print_receipt(receipt) for receipt in receipts], len(receipts))
+
+
+def cases(sku_counts: list[int], seed: int = 1) -> Iterator[Case]:
+    for skus in sku_counts:
+        store = SyntheticStore(skus, seed)
+        rng = random.Random(seed)
+        offers = generate_offers(store, rng, bundle_count=max(20, skus // 200), popular=min(skus, 2_000))
+        teller = build_teller(store, offers)
+        carts = list(generate_baskets(store, CARTS, rng))
+        yield checkout_case(f'checkout/{skus}', teller, carts)
+        yield checkout_case(f'checkout_bundle_heavy/{skus}', teller, list(bundle_heavy_baskets(store, offers, CARTS, rng)))
+        yield receipt_totals_case(f'receipt_totals/{skus}', teller, carts)
+        if skus == sku_counts[0]:
+            # rendering does not depend on the size of the catalog
+            receipts = [teller.checks_out_articles_from(cart) for cart in carts[:RECEIPTS]]
+            yield html_render_case('html_render', receipts)
+
+
+def measure(case: Case, samples: int) -> list[float]:
+    """Seconds per operation of ``samples`` runs, after one warm-up run."""
+    case.run()
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        case.run()
+        times.append((time.perf_counter() - start) / case.operations)
+    return times
+
+
+def slower_p_value(baseline: list[float], current: list[float]) -> float:
+    """One-sided Mann-Whitney U p-value for ``current`` samples being larger than ``baseline`` samples.
+
+    Uses the normal approximation with tie and continuity corrections, fine from about ten samples each.
+    """
+    n1, n2 = len(baseline), len(current)
+    n = n1 + n2
+    values = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    current_ranks = 0.0
+    ties = 0
+    i = 0
+    while i < n:
+        j = i
+        while j < n and values[j][0] == values[i][0]:
+            j += 1
+        # tied values share the average of their ranks i + 1 .. j
+        current_ranks += (i + 1 + j) / 2 * sum(group for _, group in values[i:j])
+        ties += (j - i) ** 3 - (j - i)
+        i = j
+    u = current_ranks - n2 * (n2 + 1) / 2
+    variance = n1 * n2 / 12 * (n + 1 - ties / (n * (n - 1)))
+    if variance == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sqrt(variance)
+    return erfc(z / sqrt(2)) / 2
+
+
+def compare(name: str, baseline: list[float], current: list[float], threshold: float) -> Comparison:
+    baseline_median, current_median = statistics.median(baseline), statistics.median(current)
+    p_value = slower_p_value(baseline, current)
+    regressed = p_value < ALPHA and current_median > baseline_median * (1 + threshold)
+    return Comparison(name, baseline_median, current_median, p_value, regressed)
+
+
+def environment() -> dict[str, str]:
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(), 'machine': platform.machine()}
+
+
+def load_baseline(path: str) -> dict[str, list[float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        stored = json.load(file)
+    if stored['environment'] != environment():
+        print(f"warning: baseline recorded on {stored['environment']}, running on {environment()}")
+    return stored['cases']
+
+
+def save_baseline(path: str, results: dict[str, list[float]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'environment': environment(), 'cases': results}, file, indent=1)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare it with the stored baseline.")
+    parser.add_argument('--skus', default='1000,100000,1000000', help="comma separated catalog sizes")
+    parser.add_argument('--samples', type=int, default=15, help="timed runs per case")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this")
+    parser.add_argument('--threshold', type=float, default=0.1, help="smallest slowdown reported as a regression")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results: dict[str, list[float]] = {}
+    regressions = []
+    print(f"{'case':<34}{'median us':>11}{'baseline':>11}{'change':>9}{'p':>9}")
+    for case in cases([int(skus) for skus in args.skus.split(',')]):
+        if args.filter not in case.name:
+            continue
+        results[case.name] = samples = measure(case, args.samples)
+        line = f"{case.name:<34}{statistics.median(samples) * 1e6:>11.2f}"
+        if case.name in baseline:
+            comparison = compare(case.name, baseline[case.name], samples, args.threshold)
+            line += f"{comparison.baseline * 1e6:>11.2f}{comparison.change:>+9.1%}{comparison.p_value:>9.4f}"
+            if comparison.regressed:
+                line += "  REGRESSION"
+                regressions.append(comparison)
+        print(line, flush=True)
+
+    if args.save_baseline:
+        # keep the baseline of cases that were filtered out
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"saved baseline to {os.path.normpath(args.baseline)}")
+    if regressions:
+        print(f"{len(regressions)} significant regressions: {', '.join(comparison.name for comparison in regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
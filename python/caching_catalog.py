@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from catalog import SupermarketCatalog
+from model_objects import Product
+
+
+class CachingCatalog(SupermarketCatalog):
+    """Bounded LRU cache of unit prices in front of another catalog.
+
+    Entries expire ``ttl`` seconds after they were fetched. Changing a price
+    through ``add_product`` invalidates the cached entry, other writers to the
+    underlying catalog should call ``invalidate``.
+    """
+
+    def __init__(self, catalog: SupermarketCatalog, max_size: int = 10_000, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.catalog = catalog
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Product, tuple[float, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add_product(self, product: Product, price: float) -> None:
+        self.catalog.add_product(product, price)
+        self.invalidate(product)
+
+    def unit_price(self, product: Product) -> float:
+        price = self._cached(product, self._clock())
+        if price is None:
+            self.misses += 1
+            price = self.catalog.unit_price(product)
+            self._store(product, price)
+        return price
+
+    def unit_prices(self, products: Iterable[Product]) -> dict[Product, float]:
+        now = self._clock()
+        prices: dict[Product, float] = {}
+        missing: list[Product] = []
+        for product in products:
+            price = self._cached(product, now)
+            if price is None:
+                missing.append(product)
+            else:
+                prices[product] = price
+        if missing:
+            self.misses += len(missing)
+            fetched = self.catalog.unit_prices(missing)
+            for product, price in fetched.items():
+                self._store(product, price)
+            prices.update(fetched)
+        return prices
+
+    def price_version(self) -> int | None:
+        return self.catalog.price_version()
+
+    def invalidate(self, product: Product | None = None) -> None:
+        if product is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(product, None)
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries)}
+
+    def _cached(self, product: Product, now: float) -> float | None:
+        entry = self._entries.get(product)
+        if entry is None:
+            return None
+        price, expires_at = entry
+        if expires_at <= now:
+            del self._entries[product]
+            return None
+        self._entries.move_to_end(product)
+        self.hits += 1
+        return price
+
+    def _store(self, product: Product, price: float) -> None:
+        self._entries[product] = (price, self._clock() + self.ttl)
+        self._entries.move_to_end(product)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -1,5 +1,9 @@
 
+import asyncio
+from collections.abc import Iterable
+
 from model_objects import Product
+from money import to_cents
 
 
 class SupermarketCatalog:
@@ -10,3 +14,68 @@ class SupermarketCatalog:
     def unit_price(self, product: Product):
         raise Exception("cannot be called from a unit test - it accesses the database")
         return float
+
+    def unit_prices(self, products: Iterable[Product]) -> dict[Product, float]:
+        # implementations backed by a database should override this with a single round trip
+        return {product: self.unit_price(product) for product in products}
+
+    def unit_price_cents(self, product: Product) -> int:
+        return to_cents(self.unit_price(product))
+
+    def price_version(self) -> int | None:
+        # changes whenever a price does; None when the catalog cannot tell, which disables CheckoutCache
+        return None
+
+
+class PriceSnapshot(SupermarketCatalog):
+    """Read-only prices fetched in one batch, used to price a single checkout.
+
+    Each price is converted to cents once, here, for the receipt lines, offers and bundles to share.
+    """
+
+    def __init__(self, prices: dict[Product, float]) -> None:
+        self.prices = prices
+        self.prices_cents = {product: to_cents(price) for product, price in prices.items()}
+
+    def add_product(self, product: Product, price: float) -> None:
+        raise Exception("a price snapshot is read-only")
+
+    def unit_price(self, product: Product) -> float:
+        return self.prices[product]
+
+    def unit_prices(self, products: Iterable[Product]) -> dict[Product, float]:
+        return {product: self.prices[product] for product in products}
+
+    def unit_price_cents(self, product: Product) -> int:
+        return self.prices_cents[product]
+
+    def price_version(self) -> int:
+        return 0
+
+
+class AsyncSupermarketCatalog:
+    """Catalog for asyncio services, price lookups are awaited instead of blocking the event loop.
+
+    ``unit_prices`` looks all products up concurrently, with at most ``max_concurrency`` lookups in
+    flight across every checkout sharing the catalog, like a connection pool. The pool belongs to
+    the event loop that first waits on it, so a catalog is used from one loop only.
+    """
+
+    def __init__(self, max_concurrency: int = 10) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._pool = asyncio.Semaphore(max_concurrency)
+
+    async def unit_price(self, product: Product) -> float:
+        raise Exception("cannot be called from a unit test - it accesses the database")
+
+    async def unit_prices(self, products: Iterable[Product]) -> dict[Product, float]:
+        # implementations backed by a database should override this with a single round trip
+        products = list(products)
+        prices = await asyncio.gather(*(self._pooled_unit_price(product) for product in products))
+        return dict(zip(products, prices))
+
+    async def _pooled_unit_price(self, product: Product) -> float:
+        async with self._pool:
+            return await self.unit_price(product)
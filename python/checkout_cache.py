@@ -0,0 +1,90 @@
+from collections import Counter, OrderedDict
+
+from money import to_amount
+from receipt import FrozenReceipt, Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+def cart_fingerprint(the_cart: ShoppingCart) -> frozenset:
+    """Canonical key of a cart, the same for every cart with the same lines in any order.
+
+    Lines are not summed per product: weighed lines are rounded one by one, so 0.5 kg twice
+    does not always cost the same as 1 kg.
+    """
+    items = the_cart.items
+    fingerprint = frozenset(items)
+    if len(fingerprint) < len(items):
+        # repeated lines are counted; (line, count) pairs never equal a line
+        fingerprint = frozenset(Counter(items).items())
+    return fingerprint
+
+
+class CheckoutCache:
+    """Bounded LRU cache of receipts in front of ``Teller.checks_out_articles_from``, keyed by cart fingerprint.
+
+    Entries are dropped as soon as the teller's catalog, its price version, the offer table or the
+    offer allocator change, so a cached receipt is always the one a checkout would return. Carts
+    on a catalog without a ``price_version`` are checked out every time. Cached receipts are
+    FrozenReceipts shared between callers; a hit returns the receipt of the first cart with the
+    same lines, whose items may be in a different order.
+    """
+
+    def __init__(self, teller: Teller, max_size: int = 10_000) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.teller = teller
+        self.max_size = max_size
+        self._entries: OrderedDict[frozenset, FrozenReceipt] = OrderedDict()
+        self._state: tuple | None = None
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def receipt(self, the_cart: ShoppingCart) -> Receipt:
+        state = self._pricing_state()
+        if state[0] is None:
+            self.bypasses += 1
+            return self.teller.checks_out_articles_from(the_cart)
+        if state != self._state:
+            self.invalidate()
+            self._state = state
+        key = cart_fingerprint(the_cart)
+        receipt = self._entries.get(key)
+        if receipt is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return receipt
+        self.misses += 1
+        receipt = self._entries[key] = FrozenReceipt(self.teller.checks_out_articles_from(the_cart))
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return receipt
+
+    def total_price_cents(self, the_cart: ShoppingCart) -> int:
+        return self.receipt(the_cart).total_price_cents()
+
+    def total_price(self, the_cart: ShoppingCart) -> float:
+        return to_amount(self.total_price_cents(the_cart))
+
+    def invalidate(self) -> None:
+        if self._entries:
+            self.invalidations += 1
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.bypasses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {'hits': self.hits, 'misses': self.misses, 'bypasses': self.bypasses, 'evictions': self.evictions,
+                'invalidations': self.invalidations, 'size': len(self._entries), 'hit_rate': self.hit_rate}
+
+    def _pricing_state(self) -> tuple:
+        # everything besides the cart that the receipt depends on; draft offer tables only grow
+        teller = self.teller
+        return (teller.catalog.price_version(), teller.catalog, teller.offer_table, len(teller.offer_table), teller.offer_allocator)
@@ -0,0 +1,111 @@
+from catalog import PriceSnapshot
+from model_objects import Discount, Offer, Product
+from money import line_cents, to_amount, to_cents
+from offer_index import OfferIndex
+from receipt import Receipt, ReceiptItem
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class ReceiptDelta:
+    """What a single scan changed on the receipt of a checkout session."""
+
+    def __init__(self, item: ReceiptItem, removed_discounts: list[Discount], added_discounts: list[Discount], total_price: float):
+        self.item = item
+        self.removed_discounts = removed_discounts
+        self.added_discounts = added_discounts
+        self.total_price = total_price
+
+
+class CheckoutSession:
+    """Prices an open cart scan by scan, for self-checkout displays.
+
+    Every scan adds one receipt line and re-evaluates only the offers that reference the scanned
+    product, so the cost of a scan does not grow with the basket. ``receipt()`` returns the same
+    receipt as ``Teller.checks_out_articles_from`` for the session's cart, priced with the offer
+    table the teller had when the session started.
+
+    The session prices its own cart, ``cart``. A cart passed in is copied into it, scanned line by
+    line: later changes to that cart do not reach the session, and scans and removals do not change it.
+    """
+
+    def __init__(self, teller: Teller, the_cart: ShoppingCart | None = None) -> None:
+        self.teller = teller
+        self.offer_table = teller.offer_table
+        self.cart = ShoppingCart()
+        # prices of the products scanned so far, fetched once each
+        self._prices: dict[Product, float] = {}
+        self._items: list[ReceiptItem] = []
+        self._discounts: dict[Offer, Discount] = {}
+        self._total_item_cents = 0
+        self._total_discount_cents = 0
+        if the_cart is not None:
+            for product_quantity in the_cart.items:
+                self.scan(product_quantity.product, product_quantity.quantity)
+
+    def scan(self, product: Product, quantity: float = 1.0) -> ReceiptDelta:
+        self.cart.add_item_quantity(product, quantity)
+        return self._update(product, quantity)
+
+    def remove(self, product: Product, quantity: float = 1.0) -> ReceiptDelta:
+        self.cart.remove_item_quantity(product, quantity)
+        return self._update(product, -quantity)
+
+    def total_price(self) -> float:
+        return to_amount(self._total_item_cents + self._total_discount_cents)
+
+    def receipt(self) -> Receipt:
+        receipt = Receipt()
+        for item in self._items:
+            receipt.add_item(item)
+        for offer in sorted(self._discounts, key=self.offer_table.offer_index.sequence):
+            receipt.add_discount(self._discounts[offer])
+        return receipt
+
+    def _update(self, product: Product, quantity: float) -> ReceiptDelta:
+        if product not in self._prices:
+            self._prices[product] = self.teller.catalog.unit_price(product)
+        unit_price_cents = to_cents(self._prices[product])
+        item = ReceiptItem.from_cents(product, quantity, unit_price_cents, line_cents(quantity, unit_price_cents))
+        self._items.append(item)
+        self._total_item_cents += item.total_price_cents
+
+        removed, added = [], []
+        for offer, new in self._affected_discounts(product).items():
+            old = self._discounts.pop(offer, None)
+            if old == new:
+                if old:
+                    self._discounts[offer] = old
+                continue
+            if old:
+                removed.append(old)
+                self._total_discount_cents -= old.discount_cents
+            if new:
+                added.append(new)
+                self._discounts[offer] = new
+                self._total_discount_cents += new.discount_cents
+        return ReceiptDelta(item, removed, added, self.total_price())
+
+    def _affected_discounts(self, product: Product) -> dict[Offer, Discount | None]:
+        prices = PriceSnapshot(self._prices)
+        allocator = self.teller.offer_allocator
+        if allocator is None:
+            offers = self.offer_table.offer_index.offers_for([product])
+            return {offer: self.cart.offer_discount(offer, products, prices) for offer, products in offers.items()}
+        # competing offers are resolved together, so re-allocate everything connected to the product
+        offers = self._connected_offers(product)
+        allocated = allocator.allocate(self.cart, offers, prices)
+        return {offer: allocated.get(offer) for offer in offers}
+
+    def _connected_offers(self, product: Product) -> dict[Offer, Product | list[Product]]:
+        # offers only compete through products that are in the cart
+        products = {product}
+        offers = self.offer_table.offer_index.offers_for(products)
+        while frontier := self._cart_products(offers) - products:
+            products |= frontier
+            offers = self.offer_table.offer_index.offers_for(products)
+        return offers
+
+    def _cart_products(self, offers: dict[Offer, Product | list[Product]]) -> set[Product]:
+        quantities = self.cart.product_quantities
+        return {product for offer in offers for product in OfferIndex.products_of(offer) if product in quantities}
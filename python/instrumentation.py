@@ -0,0 +1,70 @@
+"""Checkout metrics: where the time of a checkout goes and how much work it did.
+
+A Teller with ``metrics`` set reports the timings ``checkout.catalog`` (the price lookups),
+``checkout.items`` (receipt lines) and ``checkout.offers`` (offer evaluation), and the counters
+``catalog.calls``, ``catalog.products``, ``offers.evaluated`` and ``offers.applied``. Wrap a
+printer in MeteredPrinter to add ``render``. Without a sink a checkout only pays a few None checks.
+profile_checkout prints the breakdown for a replayed POS export.
+"""
+import time
+from collections import defaultdict
+
+from receipt import Receipt
+
+
+class MetricsSink:
+    """Receives checkout metrics, the base class discards them.
+
+    Subclass it to forward metrics to a monitoring system.
+    """
+
+    def timing(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+
+class StageMetrics(MetricsSink):
+    """Keeps every timing in memory, for profiling runs and tests."""
+
+    def __init__(self) -> None:
+        self.timings: defaultdict[str, list[float]] = defaultdict(list)
+        self.counters: defaultdict[str, int] = defaultdict(int)
+
+    def timing(self, name: str, seconds: float) -> None:
+        self.timings[name].append(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def total(self, name: str) -> float:
+        return sum(self.timings[name])
+
+    def percentile(self, name: str, percent: float) -> float:
+        samples = sorted(self.timings[name])
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    def report(self) -> str:
+        overall = sum(self.total(name) for name in self.timings) or 1
+        lines = [f"{'stage':<18}{'calls':>9}{'total ms':>11}{'mean us':>10}{'p99 us':>10}{'share':>8}"]
+        for name, samples in sorted(self.timings.items()):
+            total = sum(samples)
+            lines.append(f"{name:<18}{len(samples):>9}{total * 1e3:>11.1f}{total / len(samples) * 1e6:>10.1f}"
+                         f"{self.percentile(name, 99) * 1e6:>10.1f}{total / overall:>8.1%}")
+        lines.extend(f"{name:<18}{value:>9}" for name, value in sorted(self.counters.items()))
+        return '\n'.join(lines)
+
+
+class MeteredPrinter:
+    """Reports the time ``printer.print_receipt`` takes as the ``render`` timing."""
+
+    def __init__(self, printer, metrics: MetricsSink) -> None:
+        self.printer = printer
+        self.metrics = metrics
+
+    def print_receipt(self, receipt: Receipt) -> str:
+        start = time.perf_counter()
+        printed = self.printer.print_receipt(receipt)
+        self.metrics.timing('render', time.perf_counter() - start)
+        return printed
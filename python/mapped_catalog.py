@@ -0,0 +1,189 @@
+"""Read-only catalog snapshots in a compact binary file that worker processes memory-map.
+
+File layout, little-endian::
+
+    header   magic b'SMCATLG1', format version, product count n, slot count s (u32 each),
+             reserved (u32), names size (u64)
+    prices   n x i64, unit prices in cents
+    offsets  (n + 1) x u32, where each name starts in the names block
+    slots    s x u32, open-addressed hash table of product index + 1 by crc32 of the name
+    units    n x u8, ProductUnit values
+    names    utf-8 product names, sorted by their bytes
+
+Files are written the same on every host but only mapped on little-endian ones, where the columns
+can be read in place. Opening a file only maps it, so startup does not depend on the size of the catalog, and every
+process on a host shares the same pages. ``python mapped_catalog.py prices.csv catalog.smc``
+writes a file from a csv with the columns ``name``, ``unit`` (``EACH`` or ``KILO``) and ``price``.
+"""
+import argparse
+import csv
+import mmap
+import struct
+import sys
+import zlib
+from collections.abc import Iterable, Iterator
+
+from catalog import SupermarketCatalog
+from model_objects import Product, ProductRegistry, ProductUnit
+from money import to_amount, to_cents
+
+MAGIC = b'SMCATLG1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIIIQ')
+
+
+def write_catalog(path: str, prices: Iterable[tuple[Product, float]]) -> int:
+    """Write the products and unit prices to ``path``, returns the number of products."""
+    entries = sorted((product.name.encode('utf-8'), product.unit.value, to_cents(price)) for product, price in prices)
+    names = bytearray()
+    offsets = [0]
+    for i, (name, _, _) in enumerate(entries):
+        if i and name == entries[i - 1][0]:
+            raise ValueError(f"duplicate product name {name.decode('utf-8')!r}")
+        names += name
+        offsets.append(len(names))
+    if len(names) > 0xFFFFFFFF:
+        raise ValueError("product names exceed 4 GiB")
+    count = len(entries)
+    slots = _hash_slots([name for name, _, _ in entries])
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, count, len(slots), 0, len(names)))
+        file.write(struct.pack(f'<{count}q', *(cents for _, _, cents in entries)))
+        file.write(struct.pack(f'<{count + 1}I', *offsets))
+        file.write(struct.pack(f'<{len(slots)}I', *slots))
+        file.write(bytes(unit for _, unit, _ in entries))
+        file.write(names)
+    return count
+
+
+def _hash_slots(names: list[bytes]) -> list[int]:
+    # at most half full, so a lookup probes two slots on average
+    mask = (1 << (2 * len(names)).bit_length()) - 1
+    slots = [0] * (mask + 1)
+    for index, name in enumerate(names):
+        slot = zlib.crc32(name) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = index + 1
+    return slots
+
+
+class MappedCatalog(SupermarketCatalog):
+    """SupermarketCatalog over a memory-mapped file written by ``write_catalog``.
+
+    Prices are looked up by product name in the mapped hash table, like FakeCatalog keyed by
+    name. Products are interned in ``registry``, pass the one the other loaders use to share them.
+    Pickling reopens the file by path, so pool workers map the snapshot instead of receiving a copy.
+    """
+
+    def __init__(self, path: str, registry: ProductRegistry | None = None) -> None:
+        # the columns are read through memoryview casts, in native byte order
+        if sys.byteorder != 'little':
+            raise NotImplementedError("catalog files are little-endian and cannot be mapped on a big-endian host")
+        self.path = path
+        self.registry = registry if registry is not None else ProductRegistry()
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a catalog file")
+        magic, version, count, slot_count, _, names_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported catalog format version {version}")
+        self._count = count
+        self._mask = slot_count - 1
+        offsets_start = HEADER.size + 8 * count
+        slots_start = offsets_start + 4 * (count + 1)
+        units_start = slots_start + 4 * slot_count
+        self._names_start = units_start + count
+        if len(self._map) != self._names_start + names_size:
+            raise ValueError(f"{path} is truncated")
+        view = memoryview(self._map)
+        self._prices = view[HEADER.size:offsets_start].cast('q')
+        self._offsets = view[offsets_start:slots_start].cast('I')
+        self._slots = view[slots_start:units_start].cast('I')
+        self._units = view[units_start:self._names_start]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, product: Product) -> bool:
+        return self._index(product.name) is not None
+
+    def __reduce__(self):
+        return MappedCatalog, (self.path,)
+
+    def __enter__(self) -> 'MappedCatalog':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_product(self, product: Product, price: float) -> None:
+        raise Exception("a mapped catalog is read-only, write a new file with write_catalog")
+
+    def unit_price(self, product: Product) -> float:
+        return to_amount(self.unit_price_cents(product))
+
+    def unit_price_cents(self, product: Product) -> int:
+        index = self._index(product.name)
+        if index is None:
+            raise KeyError(product.name)
+        return self._prices[index]
+
+    def price_version(self) -> int:
+        # a mapped file never changes, new prices come in a new file and a new catalog
+        return 0
+
+    def product(self, name: str) -> Product:
+        index = self._index(name)
+        if index is None:
+            raise KeyError(name)
+        return self.registry.product(name, ProductUnit(self._units[index]))
+
+    def products(self) -> Iterator[Product]:
+        for index in range(self._count):
+            yield self.registry.product(self._name(index).decode('utf-8'), ProductUnit(self._units[index]))
+
+    def close(self) -> None:
+        # the views have to be released before the map can be closed
+        self._prices.release()
+        self._offsets.release()
+        self._slots.release()
+        self._units.release()
+        self._map.close()
+
+    def _name(self, index: int) -> bytes:
+        start = self._names_start
+        return self._map[start + self._offsets[index]:start + self._offsets[index + 1]]
+
+    def _index(self, name: str) -> int | None:
+        key = name.encode('utf-8')
+        names, offsets, slots, start, mask = self._map, self._offsets, self._slots, self._names_start, self._mask
+        slot = zlib.crc32(key) & mask
+        while entry := slots[slot]:
+            if names[start + offsets[entry - 1]:start + offsets[entry]] == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+        return None
+
+
+def read_price_csv(path: str, registry: ProductRegistry | None = None) -> Iterator[tuple[Product, float]]:
+    registry = registry if registry is not None else ProductRegistry()
+    with open(path, newline='', encoding='utf-8') as lines:
+        for record in csv.DictReader(lines):
+            yield registry.product(record['name'], ProductUnit[record['unit'].upper()]), float(record['price'])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a memory-mappable catalog file from a price csv.")
+    parser.add_argument('prices', help="csv with the columns name, unit and price")
+    parser.add_argument('catalog', help="catalog file to write")
+    args = parser.parse_args(argv)
+    count = write_catalog(args.catalog, read_price_csv(args.prices))
+    print(f"wrote {count} products to {args.catalog}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 from enum import Enum
+from typing import NamedTuple
+
+from money import to_amount, to_cents
 
 
 class ProductUnit(Enum):
@@ -7,15 +10,57 @@ class ProductUnit(Enum):
 
 
 class Product:
+    """Immutable product, equal to and hashing like any other product with the same name and unit."""
+    __slots__ = ('name', 'unit', '_hash')
+
     def __init__(self, name: str, unit: ProductUnit):
-        self.name = name
-        self.unit = unit
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'unit', unit)
+        # products are dict keys all over checkout, so hash once
+        object.__setattr__(self, '_hash', hash((name, unit)))
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Product is immutable")
 
-class ProductQuantity:
-    def __init__(self, product: Product, quantity: float):
-        self.product = product
-        self.quantity = quantity
+    def __delattr__(self, name):
+        raise AttributeError("Product is immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not Product:
+            return NotImplemented
+        return self.name == other.name and self.unit == other.unit
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return Product, (self.name, self.unit)
+
+    def __repr__(self):
+        return f"Product({self.name!r}, {self.unit})"
+
+
+class ProductRegistry:
+    """Interns products so that every (name, unit) exists once in memory."""
+
+    def __init__(self) -> None:
+        self._products: dict[Product, Product] = {}
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def product(self, name: str, unit: ProductUnit) -> Product:
+        return self.intern(Product(name, unit))
+
+    def intern(self, product: Product) -> Product:
+        return self._products.setdefault(product, product)
+
+
+class ProductQuantity(NamedTuple):
+    product: Product
+    quantity: float
 
 
 class SpecialOfferType(Enum):
@@ -31,10 +76,36 @@ class Offer:
         self.offer_type = offer_type
         self.product = product
         self.argument = argument
+        # the pricing rule compiled from this offer, see offer_rules
+        self.compiled = None
 
 
-class Discount:
-    def __init__(self, product: Product | list[Product], description: str, discount_amount: float):
-        self.product = product
-        self.description = description
-        self.discount_amount = discount_amount
+class _DiscountLine(NamedTuple):
+    # bundle discounts hold a tuple of products
+    product: Product | tuple[Product, ...]
+    description: str
+    # negative, in whole cents, see money
+    discount_cents: int
+
+
+class Discount(_DiscountLine):
+    """A discount on the receipt. Built from an amount like ``Discount(apples, "3 for 2", -0.99)``,
+    which is rounded to the cent once; pricing code that has whole cents uses ``from_cents``.
+    """
+    __slots__ = ()
+
+    def __new__(cls, product: Product | tuple[Product, ...], description: str, discount_amount: float):
+        return super().__new__(cls, product, description, to_cents(discount_amount))
+
+    @classmethod
+    def from_cents(cls, product: Product | tuple[Product, ...], description: str, discount_cents: int) -> 'Discount':
+        if type(discount_cents) is not int:
+            raise TypeError(f"discount_cents must be whole cents, got {discount_cents!r}")
+        return super().__new__(cls, product, description, discount_cents)
+
+    def __reduce__(self):
+        return Discount.from_cents, tuple(self)
+
+    @property
+    def discount_amount(self) -> float:
+        return to_amount(self.discount_cents)
@@ -0,0 +1,56 @@
+"""Fixed-point money: amounts are whole cents held in ints, quantities are metered in thousandths.
+
+Catalog prices and offer arguments arrive as decimal floats and are converted once with
+``to_cents``. Every receipt line (an item or a discount) is then computed exactly in integers and
+rounded once, to the nearest cent with ties going in the customer's favour: a charge of 99.5 cents
+becomes 99, a discount of -29.5 cents becomes -30. Receipt totals are exact sums of the lines.
+"""
+
+from math import floor, trunc
+
+CENTS_PER_UNIT = 100
+# quantities are weighed to the gram, or counted in thousandths of an item
+MILLIS_PER_UNIT = 1000
+
+
+def to_cents(amount: float) -> int:
+    # floor(x + 0.5) is several times faster than round() and prices never sit on a half cent
+    return floor(amount * CENTS_PER_UNIT + 0.5)
+
+
+def to_amount(cents: int) -> float:
+    # the nearest float to the decimal amount, exact enough to print and compare with literals
+    return cents / CENTS_PER_UNIT
+
+
+def to_millis(quantity: float) -> int:
+    return floor(quantity * MILLIS_PER_UNIT + 0.5)
+
+
+def divide_cents(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded to the nearest cent, ties towards the lower amount.
+
+    Charges are positive and discounts negative, so ties always favour the customer.
+    """
+    return -((denominator - 2 * numerator) // (2 * denominator))
+
+
+def line_cents(quantity: float, unit_price_cents: int) -> int:
+    """The price of ``quantity`` items of a product, rounded per line.
+
+    A voided line (negative quantity) is rounded like the line it cancels, so the two add up to zero.
+    """
+    whole = trunc(quantity)
+    if whole == quantity:
+        # counted items, the common case, need no rounding
+        return whole * unit_price_cents
+    if quantity < 0:
+        return -line_cents(-quantity, unit_price_cents)
+    return divide_cents(to_millis(quantity) * unit_price_cents, MILLIS_PER_UNIT)
+
+
+def format_cents(cents: int) -> str:
+    """'4.97', '-0.30': the amount with two decimals, without going through floats."""
+    sign = '-' if cents < 0 else ''
+    units, remainder = divmod(abs(cents), CENTS_PER_UNIT)
+    return f'{sign}{units}.{remainder:02d}'
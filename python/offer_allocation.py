@@ -0,0 +1,250 @@
+import math
+import time
+from collections import Counter
+
+from catalog import SupermarketCatalog
+from model_objects import Discount, Offer, Product, SpecialOfferType
+from offer_rules import CompiledOffer, compile_offer
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+
+# quantities are floats, so allow for rounding when counting how often an offer fits
+_EPSILON = 1e-9
+
+
+class OfferAllocator:
+    """Assigns every unit in a cart to at most one offer, choosing the assignment that saves the customer most.
+
+    Offers that share products form a component and each component is solved on its own with a
+    depth first branch and bound search over how often every bulk offer and bundle is applied.
+    Proportional offers such as percentage discounts take the units left over. The first branch
+    explored is the greedy assignment, if ``time_budget`` seconds per checkout run out the best
+    assignment found so far is used. Components not set up by then skip ranking their offers and
+    the search: their offers take what they can in the order given, in one pass.
+    """
+
+    def __init__(self, time_budget: float = 0.005) -> None:
+        self.time_budget = time_budget
+        # checkouts that ran out of time and used the best assignment found so far
+        self.budget_exceeded = 0
+
+    def apply(self, the_cart: ShoppingCart, receipt: Receipt, offers: dict[Offer, Product | list[Product]],
+              catalog: SupermarketCatalog):
+        for discount in self.allocate(the_cart, offers, catalog).values():
+            receipt.add_discount(discount)
+
+    def allocate(self, the_cart: ShoppingCart, offers: dict[Offer, Product | list[Product]],
+                 catalog: SupermarketCatalog) -> dict[Offer, Discount]:
+        """The discount of every offer that ends up applied, in the order of ``offers``."""
+        deadline = time.perf_counter() + self.time_budget
+        allocation = _Allocation(the_cart, offers, catalog, deadline)
+        discounts: dict[Offer, Discount] = {}
+        out_of_time = allocation.out_of_time
+        for component in allocation.components():
+            discounts.update(component.solve())
+            out_of_time = out_of_time or component.out_of_time
+        self.budget_exceeded += out_of_time
+        return {offer: discounts[offer] for offer in offers if offer in discounts}
+
+
+class _Claim:
+    """An offer applied a whole number of times, each use consuming ``units`` of some products."""
+
+    def __init__(self, offer: Offer, units: dict[int, float], savings, compiled: CompiledOffer | None = None):
+        self.offer = offer
+        self.units = units
+        # number of uses -> money saved, positive
+        self.savings = savings
+        self.compiled = compiled
+        self.greedy_rate = self.best_rate = 0.0
+
+    def max_uses(self, remaining: list[float]) -> int:
+        return min(math.floor(remaining[product] / units + _EPSILON) for product, units in self.units.items())
+
+    def take(self, remaining: list[float], uses: int):
+        for product, units in self.units.items():
+            remaining[product] -= uses * units
+
+    def rate(self, uses: int) -> float:
+        # savings per unit consumed; bundles spread theirs over every member
+        if uses <= 0:
+            return 0.0
+        return self.savings(uses) / (uses * sum(self.units.values()))
+
+
+class _Allocation:
+    """The offers of one checkout that can apply, on products numbered by their position in the cart."""
+
+    def __init__(self, the_cart: ShoppingCart, offers: dict[Offer, Product | list[Product]], catalog: SupermarketCatalog,
+                 deadline: float = math.inf):
+        self.cart = the_cart
+        self.catalog = catalog
+        self.deadline = deadline
+        self.products = [product for product, quantity in the_cart.product_quantities.items() if quantity > 0]
+        self.index = {product: i for i, product in enumerate(self.products)}
+        self.quantities = [the_cart.product_quantities[product] for product in self.products]
+        # unit prices in whole cents, savings below are in cents too
+        self.prices = [catalog.unit_price_cents(product) for product in self.products]
+        self.claims: list[_Claim] = []
+        # product -> offers whose discount is proportional to the quantity
+        self.proportional: dict[int, list[tuple[Offer, CompiledOffer]]] = {}
+        for offer in offers:
+            if offer.offer_type == SpecialOfferType.BUNDLE and not isinstance(offer.product, Product):
+                self._add_bundle(offer)
+            elif isinstance(offer.product, Product):
+                self._add_same_product_offer(offer)
+        self.out_of_time = time.perf_counter() > deadline
+
+    def _add_bundle(self, offer: Offer):
+        products = offer.product
+        if not products or any(product not in self.index for product in products):
+            return
+        units = dict(Counter(self.index[product] for product in products))
+        self.claims.append(_Claim(offer, units, lambda uses: -self.cart.calculate_bundle_discount(uses, products, self.catalog)))
+
+    def _add_same_product_offer(self, offer: Offer):
+        compiled = offer.compiled or compile_offer(offer)
+        if compiled is None or offer.product not in self.index:
+            return
+        product = self.index[offer.product]
+        if compiled.allocation_step is None:
+            self.proportional.setdefault(product, []).append((offer, compiled))
+            return
+        step, price = compiled.allocation_step, self.prices[product]
+        self.claims.append(_Claim(offer, {product: step}, lambda uses: -compiled.discount_amount(uses * step, price), compiled))
+
+    def proportional_rate(self, product: int, compiled: CompiledOffer) -> float:
+        return -compiled.discount_amount(1.0, self.prices[product])
+
+    def components(self) -> list['_Component']:
+        # union-find over products, claims sharing a product end up in the same component
+        parent = list(range(len(self.products)))
+
+        def find(product: int) -> int:
+            while parent[product] != product:
+                parent[product] = parent[parent[product]]
+                product = parent[product]
+            return product
+
+        for claim in self.claims:
+            first, *others = claim.units
+            for other in others:
+                parent[find(other)] = find(first)
+        claims: dict[int, list[_Claim]] = {}
+        for claim in self.claims:
+            claims.setdefault(find(next(iter(claim.units))), []).append(claim)
+        proportional: dict[int, dict[int, list]] = {}
+        for product, offers in self.proportional.items():
+            proportional.setdefault(find(product), {})[product] = offers
+        return [_Component(self, claims.get(root, []), proportional.get(root, {})) for root in claims.keys() | proportional.keys()]
+
+    def past_deadline(self) -> bool:
+        # sticky, so once time is up every later component goes straight to the single pass
+        self.out_of_time = self.out_of_time or time.perf_counter() > self.deadline
+        return self.out_of_time
+
+
+class _Component:
+    def __init__(self, allocation: _Allocation, claims: list[_Claim], proportional: dict[int, list[tuple[Offer, CompiledOffer]]]):
+        self.allocation = allocation
+        self.proportional = proportional
+        self.claims = claims
+        self.out_of_time = allocation.past_deadline()
+        if self.out_of_time:
+            # ranking claims costs a savings calculation each, past the deadline they keep their order
+            return
+        quantities = allocation.quantities
+        self.proportional_rates = {product: max(allocation.proportional_rate(product, compiled) for _, compiled in offers)
+                                   for product, offers in proportional.items()}
+        # most valuable claims first, so the first branch explored is the greedy assignment
+        for claim in claims:
+            claim.greedy_rate = claim.rate(max(claim.max_uses(quantities), 1))
+            claim.best_rate = max(claim.rate(1), claim.greedy_rate)
+        self.claims = sorted(claims, key=lambda claim: -claim.greedy_rate)
+        self._suffix_rates()
+
+    def _suffix_rates(self):
+        # the bound at claim i credits every remaining unit of product p with the best savings per
+        # unit any of the claims i.. or a proportional offer could still give it; only the rates
+        # of the claim's own products change from one claim to the next
+        rates = dict(self.proportional_rates)
+        self._rates_at: list[dict[int, float]] = [{}] * len(self.claims)
+        self._rates_after: list[dict[int, float]] = [{}] * len(self.claims)
+        for i in reversed(range(len(self.claims))):
+            claim = self.claims[i]
+            self._rates_after[i] = {product: rates.get(product, 0.0) for product in claim.units}
+            for product in claim.units:
+                rates[product] = max(rates.get(product, 0.0), claim.best_rate)
+            self._rates_at[i] = {product: rates[product] for product in claim.units}
+        self._optimistic = sum(self.allocation.quantities[product] * rate for product, rate in rates.items())
+
+    def solve(self) -> dict[Offer, Discount]:
+        if self.out_of_time:
+            return self._discounts(self._single_pass_uses())
+        self.best_savings = -1.0
+        self.best_uses: list[int] = []
+        self.deadline = self.allocation.deadline
+        self.nodes = 0
+        self._search(0, list(self.allocation.quantities), [], 0.0, self._optimistic)
+        return self._discounts(self.best_uses)
+
+    def _single_pass_uses(self) -> list[int]:
+        remaining = list(self.allocation.quantities)
+        uses = []
+        for claim in self.claims:
+            uses.append(claim.max_uses(remaining))
+            claim.take(remaining, uses[-1])
+        return uses
+
+    def _search(self, i: int, remaining: list[float], uses: list[int], savings: float, optimistic: float):
+        # optimistic: the most the remaining units could still save, an upper bound
+        if i == len(self.claims):
+            if savings + optimistic > self.best_savings:
+                self.best_savings, self.best_uses = savings + optimistic, list(uses)
+            return
+        self.nodes += 1
+        if self.nodes % 64 == 0 and time.perf_counter() > self.deadline:
+            self.out_of_time = True
+        if self.out_of_time and self.best_uses or savings + optimistic <= self.best_savings:
+            return
+        claim, after = self.claims[i], self._rates_after[i]
+        base = optimistic - sum(remaining[product] * rate for product, rate in self._rates_at[i].items())
+        for count in range(claim.max_uses(remaining), -1, -1):
+            claim.take(remaining, count)
+            uses.append(count)
+            self._search(i + 1, remaining, uses, savings + (claim.savings(count) if count else 0.0),
+                         base + sum(remaining[product] * rate for product, rate in after.items()))
+            uses.pop()
+            claim.take(remaining, -count)
+
+    def _discounts(self, uses: list[int]) -> dict[Offer, Discount]:
+        allocation = self.allocation
+        discounts: dict[Offer, Discount | None] = {}
+        remaining = list(allocation.quantities)
+        for claim, count in zip(self.claims, uses):
+            claim.take(remaining, count)
+        for product, offers in self.proportional.items():
+            offer, compiled = max(offers, key=lambda entry: allocation.proportional_rate(product, entry[1]))
+            if remaining[product] > _EPSILON:
+                discounts[offer] = compiled.discount(allocation.products[product], remaining[product], allocation.prices[product])
+                remaining[product] = 0
+        for claim, count in zip(self.claims, uses):
+            if count:
+                discounts[claim.offer] = self._claim_discount(claim, count, remaining)
+        return {offer: discount for offer, discount in discounts.items() if discount}
+
+    def _claim_discount(self, claim: _Claim, count: int, remaining: list[float]) -> Discount | None:
+        allocation = self.allocation
+        if claim.compiled is None:
+            products = claim.offer.product
+            return Discount.from_cents(tuple(products), f"{count} Bundle", allocation.cart.calculate_bundle_discount(count, products, allocation.catalog))
+        (product, step), = claim.units.items()
+        price = allocation.prices[product]
+        quantity = count * step
+        # units nobody else claimed go along if they do not lower the savings, for a single offer
+        # that reproduces exactly what it would price on its own
+        extended = quantity + remaining[product]
+        if remaining[product] > _EPSILON and claim.compiled.discount_amount(extended, price) <= claim.compiled.discount_amount(quantity, price):
+            quantity = extended
+            remaining[product] = 0
+        return claim.compiled.discount(allocation.products[product], quantity, price)
@@ -0,0 +1,38 @@
+from collections.abc import Iterable
+
+from model_objects import Offer, Product
+
+
+class OfferIndex:
+    """Offers keyed by every product they touch, so a checkout only visits offers relevant to its cart."""
+
+    def __init__(self) -> None:
+        self._by_product: dict[Product, list[Offer]] = {}
+        self._sequence: dict[Offer, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sequence)
+
+    def add(self, offer: Offer):
+        self._sequence[offer] = len(self._sequence)
+        for product in self.products_of(offer):
+            offers = self._by_product.setdefault(product, [])
+            if offer not in offers:
+                offers.append(offer)
+
+    def offers_for(self, products: Iterable[Product]) -> dict[Offer, Product | list[Product]]:
+        # collect every offer touching one of the products, then restore registration order
+        matching: set[Offer] = set()
+        for product in products:
+            matching.update(self._by_product.get(product, ()))
+        ordered = sorted(matching, key=self._sequence.__getitem__)
+        return {offer: offer.product for offer in ordered}
+
+    def sequence(self, offer: Offer) -> int:
+        return self._sequence[offer]
+
+    @staticmethod
+    def products_of(offer: Offer) -> list[Product]:
+        if isinstance(offer.product, Product):
+            return [offer.product]
+        return list(offer.product)
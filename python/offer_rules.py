@@ -0,0 +1,96 @@
+from collections.abc import Callable, Hashable
+from functools import partial
+from math import trunc
+
+from model_objects import Discount, Offer, Product, SpecialOfferType
+from money import MILLIS_PER_UNIT, divide_cents, to_cents, to_millis
+
+
+class CompiledOffer:
+    """A same-product offer compiled into its pricing function, with its description built once."""
+    __slots__ = ('offer', 'description', 'discount_amount', 'allocation_step')
+
+    def __init__(self, offer: Offer, description: str, discount_amount: Callable[[float, int], int],
+                 allocation_step: float | None = 1.0):
+        self.offer = offer
+        self.description = description
+        # (quantity, unit price in cents) -> discount in whole cents, negative or zero
+        self.discount_amount = discount_amount
+        # units the offer consumes at a time when offers compete for them, None when the discount
+        # is proportional to the quantity; see offer_allocation
+        self.allocation_step = allocation_step
+
+    def discount(self, product: Product, quantity: float, unit_price_cents: int) -> Discount | None:
+        discount_cents = self.discount_amount(quantity, unit_price_cents)
+        if discount_cents:
+            return Discount.from_cents(product, self.description, discount_cents)
+        return None
+
+
+OfferRule = Callable[[Offer], CompiledOffer]
+
+_rules: dict[Hashable, OfferRule] = {}
+
+
+def offer_rule(offer_type: Hashable) -> Callable[[OfferRule], OfferRule]:
+    """Register the function compiling offers of ``offer_type``, replacing any earlier rule."""
+    def register(rule: OfferRule) -> OfferRule:
+        _rules[offer_type] = rule
+        return rule
+    return register
+
+
+def compile_offer(offer: Offer) -> CompiledOffer | None:
+    rule = _rules.get(offer.offer_type)
+    if rule is None or not isinstance(offer.product, Product):
+        return None
+    return rule(offer)
+
+
+def is_built_in_rule(offer_type: Hashable) -> bool:
+    return _rules.get(offer_type) in _BUILT_IN_RULES
+
+
+def calculate_bulk_purchase_discount(quantity: float, unit_price_cents: int, bulk: int, amount_cents: int) -> int:
+    # every complete bulk costs amount instead of bulk unit prices, the rest is charged as usual
+    whole = trunc(quantity)
+    bulks = whole // bulk if whole == quantity else to_millis(quantity) // (bulk * MILLIS_PER_UNIT)
+    return bulks * (amount_cents - bulk * unit_price_cents)
+
+
+def calculate_discount_x_percent(quantity: float, unit_price_cents: int, offer_argument: float) -> int:
+    # the percentage in hundredths, so the whole product stays an integer until the line is rounded
+    basis_points = round(offer_argument * 100)
+    return divide_cents(-to_millis(quantity) * unit_price_cents * basis_points, MILLIS_PER_UNIT * 100 * 100)
+
+
+# the pricing functions are module-level functions or partials of them, never closures, so compiled
+# offers (and the tellers holding them) can be pickled into worker processes
+
+def three_for_two_discount(quantity: float, unit_price_cents: int) -> int:
+    return calculate_bulk_purchase_discount(quantity, unit_price_cents, 3, 2 * unit_price_cents)
+
+
+@offer_rule(SpecialOfferType.THREE_FOR_TWO)
+def three_for_two(offer: Offer) -> CompiledOffer:
+    return CompiledOffer(offer, "3 for 2", three_for_two_discount, 3)
+
+
+@offer_rule(SpecialOfferType.TWO_FOR_AMOUNT)
+def two_for_amount(offer: Offer) -> CompiledOffer:
+    return CompiledOffer(offer, f"2 for {offer.argument}",
+                         partial(calculate_bulk_purchase_discount, bulk=2, amount_cents=to_cents(offer.argument)), 2)
+
+
+@offer_rule(SpecialOfferType.FIVE_FOR_AMOUNT)
+def five_for_amount(offer: Offer) -> CompiledOffer:
+    return CompiledOffer(offer, f"5 for {offer.argument}",
+                         partial(calculate_bulk_purchase_discount, bulk=5, amount_cents=to_cents(offer.argument)), 5)
+
+
+@offer_rule(SpecialOfferType.TEN_PERCENT_DISCOUNT)
+def ten_percent_discount(offer: Offer) -> CompiledOffer:
+    return CompiledOffer(offer, "10.0% off", partial(calculate_discount_x_percent, offer_argument=10.0), None)
+
+
+_BUILT_IN_RULES = (three_for_two, two_for_amount, five_for_amount, ten_percent_discount)
@@ -0,0 +1,161 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Mapping
+from math import inf
+from types import MappingProxyType
+
+from model_objects import Offer, Product, SpecialOfferType
+from offer_index import OfferIndex
+from offer_rules import compile_offer
+
+OfferRow = tuple[SpecialOfferType, Product | list[Product], float]
+
+
+class OfferTable:
+    """Compiled and indexed offers, in effect from ``valid_from`` until ``valid_until`` (epoch seconds).
+
+    A Teller starts with a draft table (``version`` None) that ``Teller.add_special_offer`` extends.
+    Tables with a version get all their offers when they are made and never change, so checkouts
+    can keep pricing with one while the teller swaps in the next. ``offers`` is a read-only view.
+    """
+
+    def __init__(self, version: int | None = None, valid_from: float = -inf, valid_until: float = inf,
+                 rows: Iterable[OfferRow] = ()) -> None:
+        if valid_until <= valid_from:
+            raise ValueError("an offer table must be valid for some time")
+        self._version = version
+        self._valid_from = valid_from
+        self._valid_until = valid_until
+        self._offers: dict[Offer, Product | list[Product]] = {}
+        self.offer_index = OfferIndex()
+        for offer_type, products, argument in rows:
+            self._add(offer_type, products, argument)
+
+    @classmethod
+    def build(cls, version: int, rows: Iterable[OfferRow], valid_from: float = -inf, valid_until: float = inf) -> 'OfferTable':
+        return cls(version, valid_from, valid_until, rows)
+
+    @property
+    def offers(self) -> Mapping[Offer, Product | list[Product]]:
+        # made on access rather than stored, a mappingproxy cannot be pickled
+        return MappingProxyType(self._offers)
+
+    @property
+    def version(self) -> int | None:
+        return self._version
+
+    @property
+    def valid_from(self) -> float:
+        return self._valid_from
+
+    @property
+    def valid_until(self) -> float:
+        return self._valid_until
+
+    def __len__(self) -> int:
+        return len(self._offers)
+
+    def __repr__(self) -> str:
+        return f"OfferTable(version={self.version}, offers={len(self)}, valid_from={self.valid_from}, valid_until={self.valid_until})"
+
+    def add(self, offer_type: SpecialOfferType, products: Product | list[Product], argument: float) -> Offer:
+        if self.version is not None:
+            raise ValueError(f"offer table version {self.version} is published and cannot change")
+        return self._add(offer_type, products, argument)
+
+    def _add(self, offer_type: SpecialOfferType, products: Product | list[Product], argument: float) -> Offer:
+        offer = Offer(offer_type, products, argument)
+        offer.compiled = compile_offer(offer)
+        self._offers[offer] = products
+        self.offer_index.add(offer)
+        return offer
+
+    def is_valid_at(self, timestamp: float) -> bool:
+        return self.valid_from <= timestamp < self.valid_until
+
+
+class OfferTableHistory:
+    """The published offer tables, to find the one in effect at any point in time.
+
+    Where validity windows overlap the highest version wins. The tables form a timeline of window
+    boundaries, each with the table in effect until the next one. ``version`` is a dict lookup and
+    ``as_of`` a bisect of the timeline, O(log n) in the number of boundaries. Publishing updates
+    the timeline where the new window falls and where dropped versions were in effect, then
+    replaces it in one store: readers never lock and see the timeline before or after a publish,
+    never a mix. Only the ``retain`` most recent versions are kept.
+    """
+
+    def __init__(self, retain: int = 1_000) -> None:
+        if retain < 1:
+            raise ValueError("retain must be at least 1")
+        self.retain = retain
+        self._publish_lock = threading.Lock()
+        # versions, window boundaries and the table in effect from each boundary to the next
+        self._state: tuple[dict[int, OfferTable], list[float], list[OfferTable | None]] = ({}, [-inf], [None])
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_publish_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._publish_lock = threading.Lock()
+
+    def publish(self, table: OfferTable) -> None:
+        if table.version is None:
+            raise ValueError("only versioned tables can be published, see OfferTable.build")
+        with self._publish_lock:
+            tables, boundaries, active = self._state
+            if table.version in tables:
+                raise ValueError(f"offer table version {table.version} is already published")
+            tables = {**tables, table.version: table}
+            boundaries, active = list(boundaries), list(active)
+            _overlay(boundaries, active, table)
+            dropped = set()
+            while len(tables) > self.retain:
+                dropped.add(min(tables))
+                del tables[min(tables)]
+            if dropped:
+                _replace_dropped(boundaries, active, tables, dropped)
+            self._state = (tables, *_merged(boundaries, active))
+
+    def version(self, version: int) -> OfferTable:
+        return self._state[0][version]
+
+    def as_of(self, timestamp: float) -> OfferTable:
+        _, boundaries, active = self._state
+        table = active[bisect_right(boundaries, timestamp) - 1]
+        if table is None:
+            raise LookupError(f"no offer table in effect at {timestamp}")
+        return table
+
+
+def _overlay(boundaries: list[float], active: list[OfferTable | None], table: OfferTable) -> None:
+    # split the timeline at the window's edges, then the table wins wherever it is the newest
+    for edge in (table.valid_from, table.valid_until):
+        i = bisect_right(boundaries, edge) - 1
+        if edge != inf and boundaries[i] != edge:
+            boundaries.insert(i + 1, edge)
+            active.insert(i + 1, active[i])
+    start, end = bisect_left(boundaries, table.valid_from), bisect_left(boundaries, table.valid_until)
+    for i in range(start, end):
+        if active[i] is None or active[i].version < table.version:
+            active[i] = table
+
+
+def _replace_dropped(boundaries: list[float], active: list[OfferTable | None], tables: dict[int, OfferTable], dropped: set[int]) -> None:
+    newest_first = sorted(tables.values(), key=lambda table: table.version, reverse=True)
+    for i, table in enumerate(active):
+        if table is not None and table.version in dropped:
+            active[i] = next((candidate for candidate in newest_first if candidate.is_valid_at(boundaries[i])), None)
+
+
+def _merged(boundaries: list[float], active: list[OfferTable | None]) -> tuple[list[float], list[OfferTable | None]]:
+    # boundaries the same table is in effect on both sides of are dropped, so the timeline does not
+    # keep growing with the edges of versions that are gone
+    keep = [i for i in range(len(active)) if i == 0 or active[i] is not active[i - 1]]
+    return [boundaries[i] for i in keep], [active[i] for i in keep]
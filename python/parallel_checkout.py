@@ -0,0 +1,64 @@
+import multiprocessing
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from multiprocessing.context import BaseContext
+
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+# state of a pool worker, set once by _init_worker
+_worker_teller: Teller | None = None
+
+
+class ParallelCheckout:
+    """Replays baskets through a Teller on a pool of worker processes.
+
+    Every worker receives one copy of the teller (catalog and offers) when it starts, carts are
+    sent in chunks and results are yielded in input order as soon as they are ready. Inputs with
+    fewer than ``min_parallel_carts`` carts are checked out in this process. Workers are started
+    with ``context``, the platform's default multiprocessing context unless given; under spawn
+    and forkserver the teller is pickled into each worker.
+    """
+
+    def __init__(self, teller: Teller, processes: int | None = None, chunk_size: int = 256,
+                 min_parallel_carts: int = 4096, context: BaseContext | None = None) -> None:
+        self.teller = teller
+        self.context = context or multiprocessing.get_context()
+        self.processes = processes or self.context.cpu_count()
+        self.chunk_size = chunk_size
+        self.min_parallel_carts = min_parallel_carts
+
+    def receipts(self, carts: Iterable[ShoppingCart]) -> Iterator[Receipt]:
+        return self._run(carts, _checkout_chunk, self.teller.checks_out_articles_from)
+
+    def totals(self, carts: Iterable[ShoppingCart]) -> Iterator[float]:
+        return self._run(carts, _total_chunk, lambda cart: self.teller.checks_out_articles_from(cart).total_price())
+
+    def _run(self, carts, chunk_function, checkout) -> Iterator:
+        carts = iter(carts)
+        head = list(islice(carts, self.min_parallel_carts))
+        if len(head) < self.min_parallel_carts or self.processes < 2:
+            yield from map(checkout, chain(head, carts))
+            return
+        with self.context.Pool(self.processes, initializer=_init_worker, initargs=(self.teller,)) as pool:
+            for results in pool.imap(chunk_function, _chunks(chain(head, carts), self.chunk_size)):
+                yield from results
+
+
+def _chunks(carts: Iterator[ShoppingCart], size: int) -> Iterator[list[ShoppingCart]]:
+    while chunk := list(islice(carts, size)):
+        yield chunk
+
+
+def _init_worker(teller: Teller) -> None:
+    global _worker_teller
+    _worker_teller = teller
+
+
+def _checkout_chunk(carts: list[ShoppingCart]) -> list[Receipt]:
+    return [_worker_teller.checks_out_articles_from(cart) for cart in carts]
+
+
+def _total_chunk(carts: list[ShoppingCart]) -> list[float]:
+    return [_worker_teller.checks_out_articles_from(cart).total_price() for cart in carts]
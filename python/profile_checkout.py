@@ -0,0 +1,63 @@
+"""Replay a POS export through a metered teller and print where the checkout time went.
+
+``python profile_checkout.py lines.csv catalog.smc --offers offers.jsonl`` prices the carts of
+``lines.csv`` (see basket_stream) on a catalog file written by mapped_catalog, renders every
+receipt and prints per-stage timings and counters, see instrumentation.
+"""
+import argparse
+import time
+from collections.abc import Mapping
+
+from basket_stream import carts_from_line_items, read_line_items, read_offers
+from instrumentation import MeteredPrinter, StageMetrics
+from mapped_catalog import MappedCatalog
+from model_objects import Product
+from offer_allocation import OfferAllocator
+from receipt_printer import ReceiptPrinter, TextReceiptPrinter
+from teller import Teller
+
+
+def profile(teller: Teller, lines_path: str, products: Mapping[str, Product], printer) -> StageMetrics:
+    metrics = StageMetrics()
+    teller.metrics = metrics
+    printer = MeteredPrinter(printer, metrics)
+    for _, cart in carts_from_line_items(read_line_items(lines_path), products):
+        start = time.perf_counter()
+        printer.print_receipt(teller.checks_out_articles_from(cart))
+        metrics.timing('checkout', time.perf_counter() - start)
+    teller.metrics = None
+    return metrics
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a POS export and print where the checkout time went.")
+    parser.add_argument('lines', help="line items, .csv or .jsonl with transaction_id, name and quantity")
+    parser.add_argument('catalog', help="catalog file written by mapped_catalog")
+    parser.add_argument('--offers', help="offers, .jsonl with type, products and argument")
+    parser.add_argument('--allocate', action='store_true', help="resolve competing offers with OfferAllocator")
+    parser.add_argument('--html', action='store_true', help="render html receipts instead of text")
+    args = parser.parse_args(argv)
+
+    with MappedCatalog(args.catalog) as catalog:
+        products = {product.name: product for product in catalog.products()}
+        teller = Teller(catalog)
+        if args.offers:
+            for offer_type, offer_products, argument in read_offers(args.offers, products):
+                teller.add_special_offer(offer_type, offer_products, argument)
+        if args.allocate:
+            teller.offer_allocator = OfferAllocator()
+        metrics = profile(teller, args.lines, products, ReceiptPrinter() if args.html else TextReceiptPrinter())
+
+    if not metrics.timings['checkout']:
+        print("no checkouts")
+        return
+    count = len(metrics.timings['checkout'])
+    print(f"{count} checkouts, mean {metrics.total('checkout') / count * 1e6:.1f} us,"
+          f" p99 {metrics.percentile('checkout', 99) * 1e6:.1f} us")
+    # the stages add up to the checkout, so the shares are of the stages only
+    del metrics.timings['checkout']
+    print(metrics.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,158 @@
+from collections.abc import Iterable, Iterator, Sequence
+from typing import NamedTuple
 
 from catalog import SupermarketCatalog
 from model_objects import Discount, Product, ProductQuantity
+from money import line_cents, to_amount, to_cents
 
 
-class ReceiptItem:
-    def __init__(self, product: Product, quantity: float, price: float, total_price: float):
-        self.product = product
-        self.quantity = quantity
-        self.price = price
-        self.total_price = total_price
+class _ItemLine(NamedTuple):
+    product: Product
+    quantity: float
+    # unit price and line total in whole cents, see money
+    price_cents: int
+    total_price_cents: int
+
+
+class ReceiptItem(_ItemLine):
+    """A line on the receipt. Built from amounts like ``ReceiptItem(apples, 2.3, 1.99, 4.58)``,
+    which are rounded to the cent once; pricing code that has whole cents uses ``from_cents``.
+    """
+    __slots__ = ()
+
+    def __new__(cls, product: Product, quantity: float, price: float, total_price: float):
+        return super().__new__(cls, product, quantity, to_cents(price), to_cents(total_price))
+
+    @classmethod
+    def from_cents(cls, product: Product, quantity: float, price_cents: int, total_price_cents: int) -> 'ReceiptItem':
+        if type(price_cents) is not int or type(total_price_cents) is not int:
+            raise TypeError(f"prices must be whole cents, got {price_cents!r} and {total_price_cents!r}")
+        return super().__new__(cls, product, quantity, price_cents, total_price_cents)
+
+    def __reduce__(self):
+        return ReceiptItem.from_cents, tuple(self)
+
+    @property
+    def price(self) -> float:
+        return to_amount(self.price_cents)
+
+    @property
+    def total_price(self) -> float:
+        return to_amount(self.total_price_cents)
+
+
+class ListView(Sequence):
+    """Read-only view of a list that is still being appended to, equal to any sequence with the same items."""
+    __slots__ = ('_list',)
+
+    def __init__(self, items: list) -> None:
+        self._list = items
+
+    def __getitem__(self, index):
+        return self._list[index]
+
+    def __len__(self) -> int:
+        return len(self._list)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._list)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ListView):
+            return self._list == other._list
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return self._list == list(other)
+
+    # a view of a list that still changes, unhashable like the list
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ListView({self._list!r})"
 
 
 class Receipt:
     def __init__(self) -> None:
         self._items: list[ReceiptItem] = []
         self._discounts: list[Discount] = []
+        self._items_view = ListView(self._items)
+        self._discounts_view = ListView(self._discounts)
+        # running totals in whole cents, exact sums of the lines
+        self._total_item_cents = 0
+        self._total_discount_cents = 0
 
     def add_cart_item_to_receipt(self, catalog: SupermarketCatalog, product_quantity: ProductQuantity):
-        product = product_quantity.product
-        quantity = product_quantity.quantity
-        unit_price = catalog.unit_price(product)
-        price = quantity * unit_price
-        self.add_product(product, quantity, unit_price, price)
+        self.add_cart_items_to_receipt(catalog, (product_quantity,))
+
+    def add_cart_items_to_receipt(self, catalog: SupermarketCatalog, product_quantities: Iterable[ProductQuantity]):
+        unit_price_cents = catalog.unit_price_cents
+        append = self._items.append
+        new_tuple = tuple.__new__
+        total = 0
+        for product, quantity in product_quantities:
+            price_cents = unit_price_cents(product)
+            # counted items are exact, only weighed ones need line_cents to round
+            total_price_cents = quantity * price_cents if quantity.__class__ is int else line_cents(quantity, price_cents)
+            # ReceiptItem.from_cents without its checks or Python frames, the cents are ints already
+            append(new_tuple(ReceiptItem, (product, quantity, price_cents, total_price_cents)))
+            total += total_price_cents
+        self._total_item_cents += total
 
     def total_price(self) -> float:
-        return round(self.total_item_price_amount() + self.total_discount_amount(), 2)
+        return to_amount(self.total_price_cents())
 
     def total_item_price_amount(self) -> float:
-        return sum(item.total_price for item in self.items)
+        return to_amount(self._total_item_cents)
 
     def total_discount_amount(self) -> float:
-        return sum(discount.discount_amount for discount in self.discounts)
+        return to_amount(self._total_discount_cents)
+
+    def total_price_cents(self) -> int:
+        return self._total_item_cents + self._total_discount_cents
+
+    def total_item_price_cents(self) -> int:
+        return self._total_item_cents
+
+    def total_discount_cents(self) -> int:
+        return self._total_discount_cents
 
     def add_product(self, product: Product, quantity: float, price: float, total_price: float):
-        self._items.append(ReceiptItem(product, quantity, price, total_price))
+        # amounts as they are printed, rounded to the cent
+        self.add_item(ReceiptItem(product, quantity, price, total_price))
+
+    def add_item(self, item: ReceiptItem):
+        self._items.append(item)
+        self._total_item_cents += item.total_price_cents
 
     def add_discount(self, discount: Discount | None):
         if discount:
             self._discounts.append(discount)
+            self._total_discount_cents += discount.discount_cents
 
     @property
-    def items(self):
-        return self._items[:]
+    def items(self) -> Sequence[ReceiptItem]:
+        return self._items_view
 
     @property
-    def discounts(self):
-        return self._discounts[:]
+    def discounts(self) -> Sequence[Discount]:
+        return self._discounts_view
+
+
+class FrozenReceipt(Receipt):
+    """Read-only copy of a receipt, safe to hand to several callers."""
+
+    def __init__(self, receipt: Receipt) -> None:
+        super().__init__()
+        self._items.extend(receipt.items)
+        self._discounts.extend(receipt.discounts)
+        self._total_item_cents = receipt.total_item_price_cents()
+        self._total_discount_cents = receipt.total_discount_cents()
+
+    def add_cart_items_to_receipt(self, catalog: SupermarketCatalog, product_quantities: Iterable[ProductQuantity]):
+        raise Exception("a frozen receipt is read-only")
+
+    def add_item(self, item: ReceiptItem):
+        raise Exception("a frozen receipt is read-only")
+
+    def add_discount(self, discount: Discount | None):
+        raise Exception("a frozen receipt is read-only")
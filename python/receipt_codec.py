@@ -0,0 +1,391 @@
+"""Compact binary encoding of receipt batches, for archiving.
+
+A batch starts with a dictionary of the products and discount descriptions it uses, so receipts
+refer to them by interned id, followed by an offset table and the receipt records. Every record
+has a fixed header with its totals, then its lines in columns::
+
+    batch    magic b'SRCB', format version (u16), flags (u16), receipt count n (u32),
+             dictionary size (u32), dictionary, (n + 1) x u64 record offsets, records
+    record   size, item count, discount count (u32 each), flags (u8),
+             total item cents, total discount cents (i64 each)
+    items    product ids (u32), quantities (i32 thousandths times two, plus one for floats, or
+             f64 when not metered in thousandths), unit prices and totals in cents (i32, or
+             i64 for huge amounts)
+    discounts product counts (u16, 0 for a single product, n for a bundle of n), description
+             ids (u32), amounts in cents (i32 or i64), product ids (u32)
+
+Integers are little-endian. Headers are packed as such, but columns are written with
+array.tobytes and read with memoryview.cast, in native byte order, so the encoder and ReceiptBatch
+refuse to run on big-endian hosts. ReceiptBatch reads totals straight from the buffer and only decodes
+a receipt's lines when they are accessed.
+"""
+import struct
+import sys
+from array import array
+from functools import cached_property
+from collections.abc import Iterable, Iterator, Sequence
+
+from model_objects import Discount, Product, ProductRegistry, ProductUnit
+from money import MILLIS_PER_UNIT, to_amount
+from receipt import Receipt, ReceiptItem
+
+MAGIC = b'SRCB'
+FORMAT_VERSION = 1
+BATCH_HEADER = struct.Struct('<4sHHII')
+RECORD_HEADER = struct.Struct('<IIIBqq')
+DICTIONARY_ENTRY = struct.Struct('<BH')
+
+_ITEM_SIZES = {code: struct.calcsize(code) for code in 'HIiqd'}
+U16_MAX = 0xFFFF
+U32_MAX = 0xFFFFFFFF
+
+# record flags
+FLOAT_QUANTITIES = 1
+WIDE_AMOUNTS = 2
+
+
+def _require_little_endian() -> None:
+    if sys.byteorder != 'little':
+        raise NotImplementedError("receipt batches are little-endian, columns cannot be encoded or read on a big-endian host")
+
+
+class ReceiptEncoder:
+    """Encodes receipts into batches, interning products and discount descriptions per batch."""
+
+    def __init__(self) -> None:
+        _require_little_endian()
+        self._start_batch()
+
+    def _start_batch(self) -> None:
+        self._products: dict[Product, int] = {}
+        self._descriptions: dict[str, int] = {}
+        self._records: list[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, receipt: Receipt) -> None:
+        self._records.append(self._encode_record(receipt))
+
+    def add_all(self, receipts: Iterable[Receipt]) -> None:
+        for receipt in receipts:
+            self.add(receipt)
+
+    def finish(self) -> bytes:
+        """The batch of every receipt added so far. The encoder starts a new batch afterwards."""
+        dictionary = self._encode_dictionary()
+        if len(dictionary) > U32_MAX or len(self._records) > U32_MAX:
+            raise ValueError("a receipt batch holds at most 4 GiB of names and 2**32 receipts, finish batches earlier")
+        offsets = array('Q', [0])
+        for record in self._records:
+            offsets.append(offsets[-1] + len(record))
+        batch = b''.join([BATCH_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(self._records), len(dictionary)),
+                          dictionary, offsets.tobytes(), *self._records])
+        self._start_batch()
+        return batch
+
+    def _product_id(self, product: Product) -> int:
+        product_id = self._products.get(product)
+        if product_id is None:
+            product_id = self._products[product] = len(self._products)
+        return product_id
+
+    def _description_id(self, description: str) -> int:
+        description_id = self._descriptions.get(description)
+        if description_id is None:
+            description_id = self._descriptions[description] = len(self._descriptions)
+        return description_id
+
+    def _encode_record(self, receipt: Receipt) -> bytes:
+        items, discounts = receipt.items, receipt.discounts
+        quantities, flags = _quantity_column([item.quantity for item in items])
+        item_amounts = [item.price_cents for item in items] + [item.total_price_cents for item in items]
+        discount_amounts = [discount.discount_cents for discount in discounts]
+        amount = 'i'
+        if any(not -2**31 <= cents < 2**31 for cents in item_amounts + discount_amounts):
+            flags |= WIDE_AMOUNTS
+            amount = 'q'
+        discount_products = [discount.product for discount in discounts]
+        if any(not isinstance(products, Product) and len(products) > U16_MAX for products in discount_products):
+            raise ValueError(f"a bundle discount can hold at most {U16_MAX} products")
+        columns = [
+            array('I', [self._product_id(item.product) for item in items]).tobytes(),
+            quantities.tobytes(),
+            array(amount, item_amounts).tobytes(),
+            array('H', [0 if isinstance(products, Product) else len(products) for products in discount_products]).tobytes(),
+            array('I', [self._description_id(discount.description) for discount in discounts]).tobytes(),
+            array(amount, discount_amounts).tobytes(),
+            array('I', [self._product_id(product) for products in discount_products
+                        for product in ((products,) if isinstance(products, Product) else products)]).tobytes(),
+        ]
+        size = RECORD_HEADER.size + sum(len(column) for column in columns)
+        if size > U32_MAX:
+            raise ValueError("a receipt record can take at most 4 GiB")
+        header = RECORD_HEADER.pack(size, len(items), len(discounts), flags, receipt.total_item_price_cents(), receipt.total_discount_cents())
+        return b''.join([header, *columns])
+
+    def _encode_dictionary(self) -> bytes:
+        parts = [struct.pack('<II', len(self._products), len(self._descriptions))]
+        for product in self._products:
+            parts.append(_dictionary_entry(product.unit.value, product.name))
+        for description in self._descriptions:
+            parts.append(_dictionary_entry(0, description))
+        return b''.join(parts)
+
+
+def _dictionary_entry(unit: int, text: str) -> bytes:
+    encoded = text.encode('utf-8')
+    if len(encoded) > U16_MAX:
+        raise ValueError(f"product names and discount descriptions are at most {U16_MAX} bytes of utf-8, got {len(encoded)}: {text[:40]!r}...")
+    return DICTIONARY_ENTRY.pack(unit, len(encoded)) + encoded
+
+
+def _quantity_column(quantities: list[float]) -> tuple[array, int]:
+    # thousandths when that is exact, as it is for everything sold by count or weighed to the gram;
+    # the low bit keeps 5 and 5.0 apart, the printers show them differently
+    millis = [round(quantity * MILLIS_PER_UNIT) for quantity in quantities]
+    if all(-2**30 <= value < 2**30 and value / MILLIS_PER_UNIT == quantity for value, quantity in zip(millis, quantities)):
+        return array('i', [2 * value + (type(quantity) is not int) for value, quantity in zip(millis, quantities)]), 0
+    return array('d', quantities), FLOAT_QUANTITIES
+
+
+def encode_receipts(receipts: Iterable[Receipt]) -> bytes:
+    encoder = ReceiptEncoder()
+    encoder.add_all(receipts)
+    return encoder.finish()
+
+
+class ReceiptBatch(Sequence):
+    """Read-only view of an encoded batch, indexable like a list of EncodedReceipt.
+
+    Decoded products are interned in ``registry``, pass the one the catalog uses to share them.
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview, registry: ProductRegistry | None = None) -> None:
+        _require_little_endian()
+        self._buffer = memoryview(buffer)
+        self.registry = registry if registry is not None else ProductRegistry()
+        if len(self._buffer) < BATCH_HEADER.size or bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError("not a receipt batch")
+        _, version, _, count, dictionary_size = BATCH_HEADER.unpack_from(self._buffer)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported receipt batch format version {version}")
+        self._count = count
+        self._dictionary_end = offsets_start = BATCH_HEADER.size + dictionary_size
+        self._records_start = offsets_start + 8 * (count + 1)
+        if len(self._buffer) < self._records_start:
+            raise ValueError("receipt batch is truncated")
+        self._offsets = self._buffer[offsets_start:self._records_start].cast('Q')
+        # records are checked against their offsets as they are read, the table only has to span the buffer
+        if self._offsets[0] != 0 or self._records_start + self._offsets[count] != len(self._buffer):
+            raise ValueError("receipt batch is truncated or corrupt")
+
+    def __len__(self) -> int:
+        return self._count
+
+    @cached_property
+    def _dictionary(self) -> tuple[list[Product], list[str]]:
+        # only decoded when lines are, reading totals does not need it
+        return _decode_dictionary(self._buffer, BATCH_HEADER.size, self._dictionary_end, self.registry)
+
+    @property
+    def products(self) -> list[Product]:
+        return self._dictionary[0]
+
+    @property
+    def descriptions(self) -> list[str]:
+        return self._dictionary[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("receipt index out of range")
+        return EncodedReceipt(self, self._record_span(index))
+
+    def _record_span(self, index: int) -> tuple[int, int]:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        if not start + RECORD_HEADER.size <= end <= self._offsets[self._count]:
+            raise ValueError(f"receipt batch record {index} is corrupt")
+        return self._records_start + start, self._records_start + end
+
+    def total_prices_cents(self) -> Iterator[int]:
+        """Total of every receipt, read from the record headers without decoding any line."""
+        buffer, start, unpack = self._buffer, self._records_start, RECORD_HEADER.unpack_from
+        offsets = self._offsets.tolist()
+        for index, (offset, end) in enumerate(zip(offsets, offsets[1:])):
+            if end - offset < RECORD_HEADER.size:
+                raise ValueError(f"receipt batch record {index} is corrupt")
+            size, _, _, _, item_cents, discount_cents = unpack(buffer, start + offset)
+            if size != end - offset:
+                raise ValueError(f"receipt batch record {index} is corrupt")
+            yield item_cents + discount_cents
+
+
+class EncodedReceipt:
+    """One receipt of a ReceiptBatch, with the interface of Receipt the printers use.
+
+    Totals come from the record header, lines are decoded on access.
+    """
+
+    def __init__(self, batch: ReceiptBatch, span: tuple[int, int]) -> None:
+        self._batch = batch
+        self._offset, self._end = span
+        size, self._item_count, self._discount_count, self._flags, self._total_item_cents, self._total_discount_cents = \
+            RECORD_HEADER.unpack_from(batch._buffer, self._offset)
+        if size != self._end - self._offset:
+            raise ValueError("receipt record size does not match the batch offsets")
+
+    def total_price(self) -> float:
+        return to_amount(self.total_price_cents())
+
+    def total_price_cents(self) -> int:
+        return self._total_item_cents + self._total_discount_cents
+
+    def total_item_price_cents(self) -> int:
+        return self._total_item_cents
+
+    def total_discount_cents(self) -> int:
+        return self._total_discount_cents
+
+    @property
+    def items(self) -> Sequence[ReceiptItem]:
+        return EncodedItems(self._batch.products, *self._columns[:4])
+
+    @property
+    def discounts(self) -> Sequence[Discount]:
+        return EncodedDiscounts(self._batch.products, self._batch.descriptions, *self._columns[4:])
+
+    def to_receipt(self) -> Receipt:
+        receipt = Receipt()
+        for item in self.items:
+            receipt.add_item(item)
+        for discount in self.discounts:
+            receipt.add_discount(discount)
+        return receipt
+
+    @cached_property
+    def _columns(self) -> list[memoryview]:
+        # casts of the batch buffer, nothing is copied
+        items, discounts = self._item_count, self._discount_count
+        amount = 'q' if self._flags & WIDE_AMOUNTS else 'i'
+        quantity = 'd' if self._flags & FLOAT_QUANTITIES else 'i'
+        columns = []
+        start = self._offset + RECORD_HEADER.size
+        buffer = self._batch._buffer
+        for code, count in (('I', items), (quantity, items), (amount, items), (amount, items), ('H', discounts), ('I', discounts),
+                            (amount, discounts)):
+            end = start + _ITEM_SIZES[code] * count
+            if end > self._end:
+                raise ValueError("receipt record is truncated")
+            columns.append(buffer[start:end].cast(code))
+            start = end
+        # a single product is stored with a count of 0
+        products = sum(count or 1 for count in columns[4].tolist())
+        if start + 4 * products != self._end:
+            raise ValueError("receipt record size does not match its columns")
+        columns.append(buffer[start:self._end].cast('I'))
+        # ids index the batch dictionary, check them once here rather than on every access
+        product_ids, description_ids = columns[0], columns[5]
+        if max(product_ids, default=-1) >= len(self._batch.products) or max(columns[7], default=-1) >= len(self._batch.products) \
+                or max(description_ids, default=-1) >= len(self._batch.descriptions):
+            raise ValueError("receipt record refers to products or descriptions the batch does not have")
+        return columns
+
+
+class EncodedItems(Sequence):
+    """Receipt items decoded one by one from the columns of a record."""
+
+    def __init__(self, products: list[Product], product_ids: memoryview, quantities: memoryview, prices: memoryview, totals: memoryview) -> None:
+        self._products = products
+        self._product_ids = product_ids
+        self._quantities = quantities
+        self._prices = prices
+        self._totals = totals
+        self._metered = quantities.format == 'i'
+
+    def __len__(self) -> int:
+        return len(self._product_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        quantity = self._quantities[index]
+        if self._metered:
+            quantity = _metered_quantity(quantity)
+        return ReceiptItem.from_cents(self._products[self._product_ids[index]], quantity, self._prices[index], self._totals[index])
+
+    def __iter__(self) -> Iterator[ReceiptItem]:
+        # decodes whole columns at once, several times faster than item by item
+        products = self._products
+        quantities = self._quantities.tolist()
+        if self._metered:
+            # _metered_quantity inlined
+            quantities = [(quantity >> 1) / MILLIS_PER_UNIT if quantity & 1 else (quantity >> 1) // MILLIS_PER_UNIT for quantity in quantities]
+        new_tuple = tuple.__new__
+        for product_id, quantity, price, total in zip(self._product_ids.tolist(), quantities, self._prices.tolist(), self._totals.tolist()):
+            # ReceiptItem.from_cents without its checks, the columns hold ints
+            yield new_tuple(ReceiptItem, (products[product_id], quantity, price, total))
+
+
+class EncodedDiscounts(Sequence):
+    """Discounts decoded one by one from the columns of a record."""
+
+    def __init__(self, products: list[Product], descriptions: list[str], product_counts: memoryview, description_ids: memoryview,
+                 amounts: memoryview, product_ids: memoryview) -> None:
+        self._products = products
+        self._descriptions = descriptions
+        self._description_ids = description_ids
+        self._amounts = amounts
+        self._product_ids = product_ids
+        self._product_counts = product_counts
+        # where the products of each discount start
+        self._starts = [0]
+        for count in product_counts:
+            self._starts.append(self._starts[-1] + (count or 1))
+
+    def __len__(self) -> int:
+        return len(self._description_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start = self._starts[index]
+        if self._product_counts[index]:
+            product = tuple(self._products[product_id] for product_id in self._product_ids[start:self._starts[index + 1]])
+        else:
+            product = self._products[self._product_ids[start]]
+        return Discount.from_cents(product, self._descriptions[self._description_ids[index]], self._amounts[index])
+
+
+def _metered_quantity(encoded: int) -> float:
+    millis = encoded >> 1
+    return millis / MILLIS_PER_UNIT if encoded & 1 else millis // MILLIS_PER_UNIT
+
+
+def _decode_dictionary(buffer: memoryview, offset: int, end: int, registry: ProductRegistry) -> tuple[list[Product], list[str]]:
+    if offset + 8 > end:
+        raise ValueError("receipt batch dictionary is truncated")
+    product_count, description_count = struct.unpack_from('<II', buffer, offset)
+    offset += 8
+    products: list[Product] = []
+    descriptions: list[str] = []
+    for index in range(product_count + description_count):
+        if offset + DICTIONARY_ENTRY.size > end:
+            raise ValueError("receipt batch dictionary is truncated")
+        unit, length = DICTIONARY_ENTRY.unpack_from(buffer, offset)
+        offset += DICTIONARY_ENTRY.size
+        if offset + length > end:
+            raise ValueError("receipt batch dictionary is truncated")
+        # invalid utf-8 and unknown units raise ValueError too
+        text = bytes(buffer[offset:offset + length]).decode('utf-8')
+        offset += length
+        if index < product_count:
+            products.append(registry.product(text, ProductUnit(unit)))
+        else:
+            descriptions.append(text)
+    if offset != end:
+        raise ValueError("receipt batch dictionary size does not match its entries")
+    return products, descriptions
@@ -1,24 +1,40 @@
-from model_objects import Discount, Product
+import functools
+import os
+
+from model_objects import Discount, Product, ProductUnit
+from money import format_cents
 from receipt import Receipt, ReceiptItem
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_template(name: str) -> Template:
+    # compiled once per process and shared by every printer, independent of the working directory
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    return env.get_template(name)
+
 
 class ReceiptPrinter:
     def __init__(self):
-        self.env = Environment(loader=FileSystemLoader('templates/'))
-        self.template = self.env.get_template('receipt_template.html')
+        self.template = _compiled_template('receipt_template.html')
+        self.env = self.template.environment
 
 
     def print_receipt(self, receipt: Receipt):
         receipt_items = [self._format_receipt_item(item) for item in receipt.items]
         discounts = [self._format_discount(discount) for discount in receipt.discounts]
-        total = receipt.total_price()
+        # the total is rendered as a float, except that an empty receipt shows the int 0 its
+        # empty sums used to give, as the approved receipts expect
+        total = receipt.total_price() if receipt_items or discounts else 0
         return self.template.render(receipt_items=receipt_items, discounts=discounts, total=total)
 
     def _format_receipt_item(self, item: ReceiptItem):
         name = item.product.name
         quantity = item.quantity
-        price = item.price
-        total_price = item.total_price
+        price = item.price_cents
+        total_price = item.total_price_cents
 
         return {
             'name': name,
@@ -30,7 +46,7 @@ class ReceiptPrinter:
     def _format_discount(self, discount: Discount):
         product = discount.product
         description = discount.description
-        discount_amount = discount.discount_amount
+        discount_amount = discount.discount_cents
 
         if isinstance(product, Product):
             name = product.name
@@ -43,5 +59,47 @@ class ReceiptPrinter:
             'discount_amount': self._format_price(discount_amount),
         }
 
-    def _format_price(self, price: float):
-        return f'${price:.2f}'
+    def _format_price(self, cents: int):
+        return f'${format_cents(cents)}'
+
+
+class TextReceiptPrinter:
+    """Plain-text receipt for thermal printers and terminals, without going through a template."""
+
+    def __init__(self, columns: int = 40):
+        self.columns = columns
+
+    def print_receipt(self, receipt: Receipt) -> str:
+        lines = [self._format_receipt_item(item) for item in receipt.items]
+        lines.extend(self._format_discount(discount) for discount in receipt.discounts)
+        lines.append('\n')
+        lines.append(self._format_line('Total: ', self._format_price(receipt.total_price_cents())))
+        return ''.join(lines)
+
+    def _format_receipt_item(self, item: ReceiptItem) -> str:
+        line = self._format_line(item.product.name, self._format_price(item.total_price_cents))
+        if item.quantity != 1:
+            line += f'  {self._format_price(item.price_cents)} * {self._format_quantity(item)}\n'
+        return line
+
+    def _format_discount(self, discount: Discount) -> str:
+        product = discount.product
+        if isinstance(product, Product):
+            name = product.name
+        else:
+            name = ', '.join(p.name for p in product)
+        return self._format_line(f'{discount.description} ({name})', self._format_price(discount.discount_cents))
+
+    def _format_line(self, name: str, value: str) -> str:
+        whitespace = ' ' * max(self.columns - len(name) - len(value), 1)
+        return f'{name}{whitespace}{value}\n'
+
+    @staticmethod
+    def _format_quantity(item: ReceiptItem) -> str:
+        if item.product.unit == ProductUnit.EACH:
+            return str(item.quantity)
+        return f'{item.quantity:.3f}'
+
+    @staticmethod
+    def _format_price(cents: int) -> str:
+        return format_cents(cents)
@@ -1,23 +1,123 @@
-from catalog import SupermarketCatalog
+import time
+from collections.abc import Iterable, Mapping
+
+from batch_checkout import BatchCheckoutResult, checkout_many, supports_offers
+from catalog import AsyncSupermarketCatalog, PriceSnapshot, SupermarketCatalog
+from instrumentation import MetricsSink
 from model_objects import Offer, Product, SpecialOfferType
+from offer_allocation import OfferAllocator
+from offer_index import OfferIndex
+from offer_tables import OfferTable, OfferTableHistory
 from receipt import Receipt
 from shopping_cart import ShoppingCart
 
 
 class Teller:
 
-    def __init__(self, catalog: SupermarketCatalog):
-        self.catalog: SupermarketCatalog = catalog
-        self.offers: dict[Offer, (Product | list[Product])] = {}
+    def __init__(self, catalog: SupermarketCatalog | AsyncSupermarketCatalog):
+        # an AsyncSupermarketCatalog only supports checks_out_articles_from_async
+        self.catalog: SupermarketCatalog | AsyncSupermarketCatalog = catalog
+        # the offers checkouts are priced with, swapped as a whole by swap_offer_table
+        self.offer_table = OfferTable()
+        # published tables, for pricing carts as of a point in time
+        self.offer_history: OfferTableHistory | None = None
+        # when set, offers competing for the same items are resolved instead of stacked
+        self.offer_allocator: OfferAllocator | None = None
+        # when set, checkouts report stage timings and counters, see instrumentation
+        self.metrics: MetricsSink | None = None
+
+    @property
+    def offers(self) -> Mapping[Offer, Product | list[Product]]:
+        return self.offer_table.offers
+
+    @property
+    def offer_index(self) -> OfferIndex:
+        return self.offer_table.offer_index
 
     def add_special_offer(self, offer_type: SpecialOfferType, products: Product | list[Product], argument: float):
-        offer = Offer(offer_type, products, argument)
-        self.offers[offer] = products
+        self.offer_table.add(offer_type, products, argument)
 
-    def checks_out_articles_from(self, the_cart: ShoppingCart):
-        receipt = Receipt()
-        for product_quantity in the_cart.items:
-            receipt.add_cart_item_to_receipt(self.catalog, product_quantity)
-        the_cart.handle_all_offers(receipt, self.offers, self.catalog)
+    def swap_offer_table(self, table: OfferTable) -> OfferTable:
+        """Price all following checkouts with ``table``, returns the table it replaces.
+
+        Checkouts already running finish with the table they started with.
+        """
+        previous = self.offer_table
+        self.offer_table = table
+        return previous
+
+    def activate_offers_as_of(self, timestamp: float) -> OfferTable:
+        """Swap in the table of ``offer_history`` in effect at ``timestamp``, e.g. from a job at midnight."""
+        return self.swap_offer_table(self.offer_history.as_of(timestamp))
+
+    def offer_table_as_of(self, as_of: float | None) -> OfferTable:
+        if as_of is None:
+            return self.offer_table
+        if self.offer_history is None:
+            raise ValueError("pricing as of a point in time needs an offer_history")
+        return self.offer_history.as_of(as_of)
+
+    def checks_out_articles_from(self, the_cart: ShoppingCart, as_of: float | None = None):
+        # the table is read once, a swap while the cart is priced does not affect it
+        return self._checkout(the_cart, self.offer_table_as_of(as_of))
 
+    def _checkout(self, the_cart: ShoppingCart, offer_table: OfferTable) -> Receipt:
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        prices = self.price_snapshot(the_cart)
+        self._meter_prices(start, prices)
+        return self.checks_out_with_prices(the_cart, prices, offer_table)
+
+    async def checks_out_articles_from_async(self, the_cart: ShoppingCart, as_of: float | None = None) -> Receipt:
+        """checks_out_articles_from for a teller on an AsyncSupermarketCatalog, awaiting the price lookups."""
+        offer_table = self.offer_table_as_of(as_of)
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        prices = PriceSnapshot(await self.catalog.unit_prices(self._priced_products(the_cart)))
+        self._meter_prices(start, prices)
+        return self.checks_out_with_prices(the_cart, prices, offer_table)
+
+    def checks_out_with_prices(self, the_cart: ShoppingCart, prices: PriceSnapshot, offer_table: OfferTable | None = None) -> Receipt:
+        if offer_table is None:
+            offer_table = self.offer_table
+        # every checkout goes through here; with metrics set each stage is timed on the way
+        metrics = self.metrics
+        start = time.perf_counter() if metrics is not None else 0.0
+        receipt = Receipt()
+        applicable_offers = offer_table.offer_index.offers_for(the_cart.product_quantities)
+        receipt.add_cart_items_to_receipt(prices, the_cart.items)
+        if metrics is not None:
+            itemized = time.perf_counter()
+            metrics.timing('checkout.items', itemized - start)
+        self._apply_offers(the_cart, receipt, applicable_offers, prices)
+        if metrics is not None:
+            metrics.timing('checkout.offers', time.perf_counter() - itemized)
+            metrics.count('offers.evaluated', len(applicable_offers))
+            metrics.count('offers.applied', len(receipt.discounts))
         return receipt
+
+    def _apply_offers(self, the_cart: ShoppingCart, receipt: Receipt, applicable_offers: dict[Offer, Product | list[Product]],
+                      prices: PriceSnapshot) -> None:
+        if self.offer_allocator is None:
+            the_cart.handle_all_offers(receipt, applicable_offers, prices)
+        else:
+            self.offer_allocator.apply(the_cart, receipt, applicable_offers, prices)
+
+    def _meter_prices(self, start: float, prices: PriceSnapshot) -> None:
+        if self.metrics is not None:
+            self.metrics.timing('checkout.catalog', time.perf_counter() - start)
+            self.metrics.count('catalog.calls')
+            self.metrics.count('catalog.products', len(prices.prices))
+
+    def checkout_many(self, carts: Iterable[ShoppingCart], as_of: float | None = None) -> BatchCheckoutResult:
+        offer_table = self.offer_table_as_of(as_of)
+        if self.offer_allocator is not None or not supports_offers(offer_table.offers):
+            return BatchCheckoutResult.from_receipts(self._checkout(cart, offer_table) for cart in carts)
+        return checkout_many(self.catalog, offer_table.offers, carts)
+
+    def price_snapshot(self, the_cart: ShoppingCart) -> PriceSnapshot:
+        # one catalog round trip per checkout
+        return PriceSnapshot(self.catalog.unit_prices(self._priced_products(the_cart)))
+
+    @staticmethod
+    def _priced_products(the_cart: ShoppingCart) -> dict[Product, None]:
+        # offers only ever price products that are in the cart
+        return dict.fromkeys(product_quantity.product for product_quantity in the_cart.items)
@@ -1,4 +1,6 @@
-from catalog import SupermarketCatalog
+import asyncio
+
+from catalog import AsyncSupermarketCatalog, SupermarketCatalog
 from model_objects import Product
 
 
@@ -6,10 +8,37 @@ class FakeCatalog(SupermarketCatalog):
     def __init__(self) -> None:
         self.products: dict[str, Product] = {}
         self.prices: dict[str, float] = {}
+        self.version = 0
 
     def add_product(self, product: Product, price: float):
         self.products[product.name] = product
         self.prices[product.name] = price
+        self.version += 1
+
+    def price_version(self) -> int:
+        return self.version
 
     def unit_price(self, product: Product) -> float:
         return self.prices[product.name]
+
+
+class FakeAsyncCatalog(AsyncSupermarketCatalog):
+    """FakeCatalog behind a simulated network round trip of ``latency`` seconds per lookup."""
+
+    def __init__(self, catalog: FakeCatalog, latency: float = 0.0, max_concurrency: int = 10) -> None:
+        super().__init__(max_concurrency)
+        self.catalog = catalog
+        self.latency = latency
+        self.lookups = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def unit_price(self, product: Product) -> float:
+        self.lookups += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return self.catalog.unit_price(product)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,67 @@
+import asyncio
+import time
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeAsyncCatalog, FakeCatalog
+
+
+class AsyncCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.products = [Product(f"product-{i}", ProductUnit.EACH) for i in range(20)]
+        for i, product in enumerate(self.products):
+            self.catalog.add_product(product, 0.5 + i)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.apples, 1.99)
+        self.cart = ShoppingCart()
+        for product in self.products:
+            self.cart.add_item_quantity(product, 3)
+        self.cart.add_item_quantity(self.apples, 2.5)
+
+    def async_teller(self, latency=0.0, max_concurrency=10):
+        teller = Teller(FakeAsyncCatalog(self.catalog, latency, max_concurrency))
+        teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.products[0], 0)
+        teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 10)
+        teller.add_special_offer(SpecialOfferType.BUNDLE, self.products[1:3], 10)
+        return teller
+
+    def test_same_receipt_as_the_synchronous_checkout(self):
+        teller = self.async_teller()
+        expected = Teller(self.catalog)
+        expected.offer_table = teller.offer_table
+        receipt = asyncio.run(teller.checks_out_articles_from_async(self.cart))
+        sync_receipt = expected.checks_out_articles_from(self.cart)
+        assert receipt.items == sync_receipt.items
+        assert receipt.discounts == sync_receipt.discounts
+        assert receipt.total_price_cents() == sync_receipt.total_price_cents()
+
+    def test_each_product_is_looked_up_once_per_checkout(self):
+        teller = self.async_teller()
+        self.cart.add_item_quantity(self.products[0], 1)
+        asyncio.run(teller.checks_out_articles_from_async(self.cart))
+        assert teller.catalog.lookups == len(self.products) + 1
+
+    def test_lookups_of_a_cart_run_concurrently(self):
+        teller = self.async_teller(latency=0.05, max_concurrency=100)
+        start = time.perf_counter()
+        asyncio.run(teller.checks_out_articles_from_async(self.cart))
+        # 21 sequential lookups would take over a second
+        assert time.perf_counter() - start < 0.5
+        assert teller.catalog.max_in_flight == len(self.products) + 1
+
+    def test_the_pool_bounds_lookups_in_flight_across_checkouts(self):
+        teller = self.async_teller(latency=0.001, max_concurrency=4)
+
+        async def checkouts():
+            return await asyncio.gather(*(teller.checks_out_articles_from_async(self.cart) for _ in range(5)))
+
+        receipts = asyncio.run(checkouts())
+        assert teller.catalog.max_in_flight == 4
+        assert len({receipt.total_price_cents() for receipt in receipts}) == 1
+
+    def test_pool_needs_a_connection(self):
+        with self.assertRaises(ValueError):
+            FakeAsyncCatalog(self.catalog, max_concurrency=0)
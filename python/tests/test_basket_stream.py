@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from basket_stream import carts_from_line_items, read_line_items, read_offers, receipts_from_file, totals_stream
+from model_objects import Product, ProductUnit, SpecialOfferType
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class BasketStreamTest(unittest.TestCase):
+    def setUp(self):
+        catalog = FakeCatalog()
+        self.teller = Teller(catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        catalog.add_product(self.toothbrush, 0.99)
+        self.apples = Product("apples", ProductUnit.KILO)
+        catalog.add_product(self.apples, 1.99)
+        self.products = {"toothbrush": self.toothbrush, "apples": self.apples}
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_csv_line_items_are_grouped_into_receipts(self):
+        path = self.write("lines.csv", "transaction_id,name,quantity\n1,toothbrush,2\n1,toothbrush,1\n2,apples,0.5\n")
+        receipts = list(receipts_from_file(self.teller, path, self.products))
+        assert [transaction_id for transaction_id, _ in receipts] == ["1", "2"]
+        assert receipts[0][1].total_price() == 1.98
+        assert receipts[1][1].total_price() == 0.99
+
+    def test_jsonl_line_items(self):
+        lines = [{"transaction_id": 7, "name": "apples", "quantity": 2}, {"transaction_id": 7, "name": "toothbrush", "quantity": 1}]
+        path = self.write("lines.jsonl", "\n".join(json.dumps(line) for line in lines) + "\n")
+        carts = carts_from_line_items(read_line_items(path), self.products)
+        assert list(totals_stream(self.teller, carts)) == [("7", 4.97)]
+
+    def test_unknown_product_is_reported_with_its_transaction(self):
+        path = self.write("lines.csv", "transaction_id,name,quantity\n3,caviar,1\n")
+        with pytest.raises(ValueError, match="transaction 3"):
+            list(receipts_from_file(self.teller, path, self.products))
+
+    def test_offers_are_read_from_jsonl(self):
+        path = self.write("offers.jsonl", '{"type": "BUNDLE", "products": ["toothbrush", "apples"], "argument": 10}\n\n'
+                                          '{"type": "TEN_PERCENT_DISCOUNT", "products": ["apples"], "argument": 20}\n')
+        assert list(read_offers(path, self.products)) == [
+            (SpecialOfferType.BUNDLE, [self.toothbrush, self.apples], 10.0),
+            (SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 20.0),
+        ]
+
+    def test_offers_of_unknown_products_are_rejected(self):
+        path = self.write("offers.jsonl", '{"type": "THREE_FOR_TWO", "products": ["rice"], "argument": 0}\n')
+        with pytest.raises(ValueError, match="offers.jsonl:1: unknown products"):
+            list(read_offers(path, self.products))
@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class BatchCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.products = []
+        for name, unit, price in [("toothbrush", ProductUnit.EACH, 0.99), ("toothpaste", ProductUnit.EACH, 1.79),
+                                  ("rice", ProductUnit.EACH, 2.99), ("apples", ProductUnit.KILO, 1.99),
+                                  ("cherry tomatoes", ProductUnit.EACH, 0.69), ("bananas", ProductUnit.KILO, 1.49)]:
+            product = Product(name, unit)
+            self.catalog.add_product(product, price)
+            self.products.append(product)
+        toothbrush, toothpaste, rice, apples, cherry_tomatoes, bananas = self.products
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [toothbrush, toothpaste], 10)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, rice, 10)
+        self.teller.add_special_offer(SpecialOfferType.FIVE_FOR_AMOUNT, apples, 7.99)
+        self.teller.add_special_offer(SpecialOfferType.TWO_FOR_AMOUNT, cherry_tomatoes, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [rice, apples, bananas], 10)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, apples, 10)
+
+    def random_carts(self, count: int) -> list[ShoppingCart]:
+        rng = random.Random(7)
+        carts = []
+        for _ in range(count):
+            cart = ShoppingCart()
+            for _ in range(rng.randint(0, 12)):
+                product = rng.choice(self.products)
+                if product.unit == ProductUnit.KILO:
+                    cart.add_item_quantity(product, round(rng.uniform(0.1, 4), 3))
+                else:
+                    cart.add_item_quantity(product, rng.randint(1, 4))
+            carts.append(cart)
+        return carts
+
+    def test_batch_results_are_identical_to_scalar_checkout(self):
+        carts = self.random_carts(500)
+        result = self.teller.checkout_many(carts)
+        assert len(result) == len(carts)
+        for i, cart in enumerate(carts):
+            receipt = self.teller.checks_out_articles_from(cart)
+            assert result.item_amounts[i] == receipt.total_item_price_amount()
+            assert result.discount_amounts[i] == receipt.total_discount_amount()
+            assert result.discount_counts[i] == len(receipt.discounts)
+            assert result.total_prices[i] == receipt.total_price()
+
+    def test_no_carts(self):
+        assert len(self.teller.checkout_many([])) == 0
@@ -0,0 +1,57 @@
+import os
+import random
+import tempfile
+import unittest
+
+from benchmarks.data import SyntheticStore, bundle_heavy_baskets, generate_baskets, generate_offers
+from benchmarks.suite import compare, load_baseline, save_baseline, slower_p_value
+from model_objects import SpecialOfferType
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.baseline = [1.0 + rng.gauss(0, 0.02) for _ in range(15)]
+        self.noise = [1.0 + rng.gauss(0, 0.02) for _ in range(15)]
+        self.slower = [1.2 + rng.gauss(0, 0.02) for _ in range(15)]
+
+    def test_a_clear_slowdown_is_significant(self):
+        assert slower_p_value(self.baseline, self.slower) < 0.001
+        assert slower_p_value(self.slower, self.baseline) > 0.99
+
+    def test_noise_is_not_significant(self):
+        assert slower_p_value(self.baseline, self.noise) > 0.01
+
+    def test_identical_samples_are_not_significant(self):
+        assert slower_p_value([1.0] * 10, [1.0] * 10) == 1.0
+
+    def test_regressions_need_both_significance_and_size(self):
+        assert compare("case", self.baseline, self.slower, threshold=0.1).regressed
+        assert not compare("case", self.baseline, self.slower, threshold=0.5).regressed
+        assert not compare("case", self.baseline, self.noise, threshold=0.0).regressed
+        assert round(compare("case", [1.0, 1.0], [1.5, 1.5], threshold=0.1).change, 2) == 0.5
+
+    def test_baseline_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "baseline.json")
+            assert load_baseline(path) == {}
+            save_baseline(path, {"checkout/1000": self.baseline})
+            assert load_baseline(path) == {"checkout/1000": self.baseline}
+
+    def test_generated_data_is_reproducible(self):
+        def generate():
+            store = SyntheticStore(500, seed=7)
+            rng = random.Random(7)
+            offers = generate_offers(store, rng, bundle_count=20, popular=100)
+            carts = list(generate_baskets(store, 50, rng, 'weekly')) + list(bundle_heavy_baskets(store, offers, 5, rng))
+            return offers, [cart.product_quantities for cart in carts]
+
+        offers, carts = generate()
+        assert (offers, carts) == generate()
+        assert sum(offer_type == SpecialOfferType.BUNDLE for offer_type, _, _ in offers) == 20
+        assert len(offers) == 70
+        assert all(5 <= len(cart) <= 80 for cart in carts[:50])
+
+    def test_unknown_basket_distribution(self):
+        with self.assertRaises(ValueError):
+            next(generate_baskets(SyntheticStore(10), 1, random.Random(), 'monthly'))
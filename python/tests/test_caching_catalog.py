@@ -0,0 +1,67 @@
+import unittest
+
+from caching_catalog import CachingCatalog
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CachingCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.fake_catalog = FakeCatalog()
+        self.catalog = CachingCatalog(self.fake_catalog, max_size=2, ttl=60, clock=self.clock)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.rice, 2.99)
+        self.catalog.add_product(self.apples, 1.99)
+
+    def test_repeated_lookups_are_served_from_the_cache(self):
+        assert self.catalog.unit_price(self.toothbrush) == 0.99
+        self.fake_catalog.prices["toothbrush"] = 5.00
+        assert self.catalog.unit_price(self.toothbrush) == 0.99
+        assert self.catalog.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1}
+
+    def test_add_product_invalidates_the_cached_price(self):
+        self.catalog.unit_price(self.toothbrush)
+        self.catalog.add_product(self.toothbrush, 1.29)
+        assert self.catalog.unit_price(self.toothbrush) == 1.29
+
+    def test_entries_expire_after_the_ttl(self):
+        self.catalog.unit_price(self.toothbrush)
+        self.fake_catalog.prices["toothbrush"] = 1.29
+        self.clock.now = 61
+        assert self.catalog.unit_price(self.toothbrush) == 1.29
+        assert self.catalog.misses == 2
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.catalog.unit_prices([self.toothbrush, self.rice])
+        self.catalog.unit_price(self.toothbrush)
+        self.catalog.unit_price(self.apples)
+        assert self.catalog.evictions == 1
+        self.catalog.unit_price(self.toothbrush)
+        self.catalog.unit_price(self.rice)
+        assert self.catalog.stats() == {'hits': 2, 'misses': 4, 'evictions': 2, 'size': 2}
+
+    def test_teller_checks_out_through_the_cache(self):
+        teller = Teller(self.catalog)
+        teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.rice, 10)
+        cart = ShoppingCart()
+        cart.add_item(self.rice)
+        cart.add_item(self.toothbrush)
+        teller.checks_out_articles_from(cart)
+        receipt = teller.checks_out_articles_from(cart)
+        assert receipt.total_price() == round(2.99 + 0.99 - 0.299, 2)
+        assert self.catalog.hits == 2
+        assert self.catalog.misses == 2
@@ -0,0 +1,114 @@
+import unittest
+
+from caching_catalog import CachingCatalog
+from catalog import SupermarketCatalog
+from checkout_cache import CheckoutCache, cart_fingerprint
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_allocation import OfferAllocator
+from offer_tables import OfferTable
+from receipt_printer import ReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class UnversionedCatalog(SupermarketCatalog):
+    def __init__(self, catalog: FakeCatalog) -> None:
+        self.catalog = catalog
+
+    def unit_price(self, product: Product) -> float:
+        return self.catalog.unit_price(product)
+
+
+class CheckoutCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.apples, 1.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0)
+        self.cache = CheckoutCache(self.teller, max_size=2)
+
+    def cart(self, *lines) -> ShoppingCart:
+        cart = ShoppingCart()
+        for product, quantity in lines:
+            cart.add_item_quantity(product, quantity)
+        return cart
+
+    def test_fingerprints_ignore_line_order_but_not_line_splits(self):
+        basket = self.cart((self.toothbrush, 3), (self.apples, 0.5), (self.apples, 0.5))
+        assert cart_fingerprint(basket) == cart_fingerprint(self.cart((self.apples, 0.5), (self.toothbrush, 3), (self.apples, 0.5)))
+        assert cart_fingerprint(basket) != cart_fingerprint(self.cart((self.toothbrush, 3), (self.apples, 1.0)))
+        assert cart_fingerprint(basket) != cart_fingerprint(self.cart((self.toothbrush, 3), (self.apples, 0.5)))
+
+    def test_identical_baskets_are_priced_once(self):
+        first = self.cache.receipt(self.cart((self.toothbrush, 3), (self.apples, 0.5)))
+        second = self.cache.receipt(self.cart((self.apples, 0.5), (self.toothbrush, 3)))
+        assert second is first
+        assert self.cache.total_price_cents(self.cart((self.toothbrush, 3), (self.apples, 0.5))) == first.total_price_cents() == 297
+        assert self.cache.stats() == {'hits': 2, 'misses': 1, 'bypasses': 0, 'evictions': 0, 'invalidations': 0, 'size': 1,
+                                      'hit_rate': 2 / 3}
+
+    def test_cached_receipts_cannot_be_changed(self):
+        basket = self.cart((self.toothbrush, 3))
+        receipt = self.cache.receipt(basket)
+        with self.assertRaises(Exception):
+            receipt.add_product(self.apples, 1, 5, 5)
+        with self.assertRaises(Exception):
+            receipt.add_discount(None)
+        assert self.cache.receipt(basket).total_price_cents() == 198
+        assert ReceiptPrinter().print_receipt(receipt) == ReceiptPrinter().print_receipt(self.teller.checks_out_articles_from(basket))
+
+    def test_least_recently_used_baskets_are_evicted(self):
+        one, two, three = self.cart((self.toothbrush, 1)), self.cart((self.toothbrush, 2)), self.cart((self.toothbrush, 3))
+        self.cache.receipt(one)
+        self.cache.receipt(two)
+        self.cache.receipt(one)
+        self.cache.receipt(three)
+        assert self.cache.evictions == 1
+        self.cache.receipt(one)
+        assert self.cache.hits == 2
+        self.cache.receipt(two)
+        assert self.cache.misses == 4
+
+    def test_price_changes_invalidate(self):
+        cart = self.cart((self.toothbrush, 1))
+        assert self.cache.total_price(cart) == 0.99
+        self.catalog.add_product(self.toothbrush, 1.09)
+        assert self.cache.total_price(cart) == 1.09
+        assert self.cache.invalidations == 1
+
+    def test_offer_changes_invalidate(self):
+        cart = self.cart((self.toothbrush, 3))
+        assert self.cache.total_price(cart) == 1.98
+        self.teller.swap_offer_table(OfferTable.build(1, []))
+        assert self.cache.total_price(cart) == 2.97
+        self.teller.swap_offer_table(OfferTable())
+        self.cache.receipt(cart)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.toothbrush, 10)
+        assert self.cache.total_price(cart) == 2.67
+        self.teller.offer_allocator = OfferAllocator()
+        self.cache.receipt(cart)
+        assert self.cache.invalidations == 4
+        assert self.cache.misses == 5
+
+    def test_catalogs_without_a_price_version_are_not_cached(self):
+        self.teller.catalog = UnversionedCatalog(self.catalog)
+        cart = self.cart((self.toothbrush, 1))
+        assert self.cache.receipt(cart) is not self.cache.receipt(cart)
+        assert self.cache.bypasses == 2
+        assert self.cache.hit_rate == 0.0
+
+    def test_caching_catalogs_report_the_version_of_their_catalog(self):
+        caching = CachingCatalog(self.catalog)
+        assert caching.price_version() == self.catalog.price_version()
+        caching.add_product(self.apples, 2.49)
+        assert caching.price_version() == self.catalog.price_version()
+
+    def test_repeated_lines_are_counted(self):
+        twice = self.cart((self.toothbrush, 1), (self.toothbrush, 1))
+        assert cart_fingerprint(twice) == cart_fingerprint(self.cart((self.toothbrush, 1), (self.toothbrush, 1)))
+        assert cart_fingerprint(twice) != cart_fingerprint(self.cart((self.toothbrush, 1)))
+        assert cart_fingerprint(twice) != cart_fingerprint(self.cart((self.toothbrush, 1), (self.toothbrush, 1), (self.toothbrush, 1)))
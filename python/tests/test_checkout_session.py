@@ -0,0 +1,83 @@
+import unittest
+
+import pytest
+
+from checkout_session import CheckoutSession
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class CheckoutSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.catalog.add_product(self.toothpaste, 1.79)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.catalog.add_product(self.rice, 2.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.toothpaste], 10)
+        self.session = CheckoutSession(self.teller)
+
+    def assert_matches_full_checkout(self):
+        expected = self.teller.checks_out_articles_from(self.session.cart)
+        actual = self.session.receipt()
+        assert actual.items == expected.items
+        assert actual.discounts == expected.discounts
+        assert self.session.total_price() == expected.total_price()
+
+    def test_each_scan_reports_the_discounts_it_changed(self):
+        self.session.scan(self.toothbrush)
+        self.session.scan(self.toothbrush)
+        delta = self.session.scan(self.toothbrush)
+        assert [discount.description for discount in delta.added_discounts] == ["3 for 2"]
+        delta = self.session.scan(self.toothpaste)
+        assert delta.removed_discounts == []
+        assert [discount.description for discount in delta.added_discounts] == ["1 Bundle"]
+        assert delta.total_price == 3.49
+        delta = self.session.scan(self.rice)
+        assert delta.added_discounts == delta.removed_discounts == []
+        self.assert_matches_full_checkout()
+
+    def test_removing_an_item_withdraws_its_discounts(self):
+        for _ in range(3):
+            self.session.scan(self.toothbrush)
+        self.session.scan(self.toothpaste)
+        delta = self.session.remove(self.toothbrush)
+        assert [discount.description for discount in delta.removed_discounts] == ["3 for 2"]
+        assert delta.item.quantity == -1
+        self.assert_matches_full_checkout()
+        self.session.remove(self.toothpaste)
+        self.assert_matches_full_checkout()
+        assert self.session.total_price() == 1.98
+
+    def test_cannot_remove_more_than_the_cart_holds(self):
+        self.session.scan(self.rice)
+        with pytest.raises(ValueError):
+            self.session.remove(self.rice, 2)
+
+    def test_session_can_start_from_an_existing_cart(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 3)
+        session = CheckoutSession(self.teller, cart)
+        assert session.total_price() == 1.98
+        assert session.cart is not cart
+        assert session.cart.product_quantities == cart.product_quantities
+
+    def test_sessions_started_from_a_cart_keep_their_own_copy(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 2)
+        cart.add_item_quantity(self.toothpaste, 1)
+        self.session = CheckoutSession(self.teller, cart)
+        cart.add_item_quantity(self.toothbrush, 1)
+        assert self.session.cart.product_quantities[self.toothbrush] == 2
+        delta = self.session.scan(self.toothbrush)
+        assert [discount.description for discount in delta.added_discounts] == ["3 for 2"]
+        self.session.remove(self.toothpaste)
+        assert cart.product_quantities == {self.toothbrush: 3, self.toothpaste: 1}
+        self.assert_matches_full_checkout()
+        assert [item.quantity for item in self.session.receipt().items] == [2, 1, 1, -1]
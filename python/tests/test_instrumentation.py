@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import profile_checkout
+from instrumentation import MeteredPrinter, MetricsSink, StageMetrics
+from mapped_catalog import write_catalog
+from model_objects import Product, ProductUnit, SpecialOfferType
+from receipt_printer import TextReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeAsyncCatalog, FakeCatalog
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.catalog.add_product(self.rice, 2.49)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.apples, 1.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.rice, 10)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.rice, self.apples], 10)
+        self.cart = ShoppingCart()
+        self.cart.add_item_quantity(self.toothbrush, 3)
+        self.cart.add_item_quantity(self.rice, 1)
+
+    def test_metered_checkout_returns_the_same_receipt(self):
+        expected = self.teller.checks_out_articles_from(self.cart)
+        self.teller.metrics = StageMetrics()
+        receipt = self.teller.checks_out_articles_from(self.cart)
+        assert receipt.items == expected.items
+        assert receipt.discounts == expected.discounts
+
+    def test_stages_and_counters(self):
+        metrics = StageMetrics()
+        self.teller.metrics = metrics
+        self.teller.checks_out_articles_from(self.cart)
+        self.teller.checks_out_articles_from(self.cart)
+        assert sorted(metrics.timings) == ['checkout.catalog', 'checkout.items', 'checkout.offers']
+        assert all(len(samples) == 2 for samples in metrics.timings.values())
+        # the bundle is evaluated but does not apply without apples
+        assert dict(metrics.counters) == {'catalog.calls': 2, 'catalog.products': 4, 'offers.evaluated': 6, 'offers.applied': 4}
+
+    def test_async_checkouts_report_the_same_stages(self):
+        metrics = StageMetrics()
+        teller = Teller(FakeAsyncCatalog(self.catalog))
+        teller.offer_table = self.teller.offer_table
+        teller.metrics = metrics
+        asyncio.run(teller.checks_out_articles_from_async(self.cart))
+        assert sorted(metrics.timings) == ['checkout.catalog', 'checkout.items', 'checkout.offers']
+        assert dict(metrics.counters) == {'catalog.calls': 1, 'catalog.products': 2, 'offers.evaluated': 3, 'offers.applied': 2}
+
+    def test_disabled_by_default(self):
+        assert self.teller.metrics is None
+
+    def test_the_base_sink_discards_metrics(self):
+        self.teller.metrics = MetricsSink()
+        assert self.teller.checks_out_articles_from(self.cart).total_price_cents() == 422
+
+    def test_metered_printer(self):
+        metrics = StageMetrics()
+        receipt = self.teller.checks_out_articles_from(self.cart)
+        printed = MeteredPrinter(TextReceiptPrinter(), metrics).print_receipt(receipt)
+        assert printed == TextReceiptPrinter().print_receipt(receipt)
+        assert len(metrics.timings['render']) == 1
+
+    def test_report(self):
+        metrics = StageMetrics()
+        for seconds in (0.001, 0.003):
+            metrics.timing('checkout.items', seconds)
+        metrics.count('offers.applied', 7)
+        lines = metrics.report().splitlines()
+        assert lines[1].split() == ['checkout.items', '2', '4.0', '2000.0', '3000.0', '100.0%']
+        assert lines[2].split() == ['offers.applied', '7']
+
+    def test_profiles_a_replay_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            catalog = os.path.join(directory, "catalog.smc")
+            write_catalog(catalog, [(self.toothbrush, 0.99), (self.rice, 2.49), (self.apples, 1.99)])
+            lines = os.path.join(directory, "lines.csv")
+            with open(lines, "w", encoding="utf-8") as file:
+                file.write("transaction_id,name,quantity\n1,toothbrush,3\n1,apples,0.5\n2,rice,1\n")
+            offers = os.path.join(directory, "offers.jsonl")
+            with open(offers, "w", encoding="utf-8") as file:
+                file.write(json.dumps({"type": "THREE_FOR_TWO", "products": ["toothbrush"], "argument": 0}) + "\n")
+                file.write(json.dumps({"type": "BUNDLE", "products": ["rice", "apples"], "argument": 10}) + "\n")
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                profile_checkout.main([lines, catalog, "--offers", offers])
+        report = output.getvalue()
+        assert report.startswith("2 checkouts")
+        assert "render" in report
+        assert "offers.applied" in report
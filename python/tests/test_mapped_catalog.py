@@ -0,0 +1,108 @@
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from mapped_catalog import MappedCatalog, main, write_catalog
+from model_objects import Product, ProductRegistry, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class MappedCatalogTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, "catalog.smc")
+        self.fake = FakeCatalog()
+        self.products = [Product(name, ProductUnit.EACH) for name in ("toothbrush", "rice", "crème brûlée", "apple")]
+        self.products.append(Product("apples", ProductUnit.KILO))
+        for i, product in enumerate(self.products):
+            self.fake.add_product(product, 0.99 + i)
+        write_catalog(self.path, ((product, self.fake.unit_price(product)) for product in self.products))
+        self.catalog = MappedCatalog(self.path)
+        self.addCleanup(self.catalog.close)
+
+    def test_prices_match_the_catalog_it_was_written_from(self):
+        assert len(self.catalog) == 5
+        for product in self.products:
+            assert self.catalog.unit_price(product) == self.fake.unit_price(product)
+            assert self.catalog.unit_price_cents(product) == self.fake.unit_price_cents(product)
+
+    def test_unknown_products(self):
+        missing = Product("apricot", ProductUnit.EACH)
+        assert missing not in self.catalog
+        assert self.products[0] in self.catalog
+        with self.assertRaises(KeyError):
+            self.catalog.unit_price(missing)
+
+    def test_products_keep_their_units(self):
+        assert self.catalog.product("apples") == Product("apples", ProductUnit.KILO)
+        assert sorted(self.catalog.products(), key=lambda product: product.name) == sorted(self.products, key=lambda product: product.name)
+
+    def test_products_are_interned_in_the_registry(self):
+        registry = ProductRegistry()
+        rice = registry.product("rice", ProductUnit.EACH)
+        with MappedCatalog(self.path, registry) as catalog:
+            assert catalog.product("rice") is rice
+            assert next(product for product in catalog.products() if product.name == "rice") is rice
+        assert self.catalog.product("apple") is self.catalog.product("apple")
+
+    def test_checkout_matches_the_fake_catalog(self):
+        cart = ShoppingCart()
+        for product in self.products:
+            cart.add_item_quantity(product, 2.5 if product.unit == ProductUnit.KILO else 3)
+        receipts = []
+        for catalog in (self.fake, self.catalog):
+            teller = Teller(catalog)
+            teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.products[0], 0)
+            teller.add_special_offer(SpecialOfferType.BUNDLE, self.products[1:3], 10)
+            receipts.append(teller.checks_out_articles_from(cart))
+        assert receipts[0].items == receipts[1].items
+        assert receipts[0].discounts == receipts[1].discounts
+
+    def test_pickles_by_path(self):
+        copy = pickle.loads(pickle.dumps(self.catalog))
+        self.addCleanup(copy.close)
+        assert copy.path == self.path
+        assert copy.unit_price(self.products[1]) == self.catalog.unit_price(self.products[1])
+
+    def test_is_read_only(self):
+        with self.assertRaises(Exception):
+            self.catalog.add_product(self.products[0], 1.00)
+
+    def test_duplicate_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            write_catalog(self.path, [(self.products[0], 1.0), (Product("toothbrush", ProductUnit.KILO), 2.0)])
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.directory, "prices.csv")
+        with open(path, "wb") as file:
+            file.write(b"name,unit,price\n" + b"x" * 64)
+        with self.assertRaises(ValueError):
+            MappedCatalog(path)
+
+    def test_big_endian_hosts_are_refused(self):
+        with mock.patch.object(sys, 'byteorder', 'big'):
+            with self.assertRaises(NotImplementedError):
+                MappedCatalog(self.path)
+
+    def test_writes_a_catalog_from_csv(self):
+        prices = os.path.join(self.directory, "prices.csv")
+        with open(prices, "w", encoding="utf-8") as file:
+            file.write("name,unit,price\nrice,EACH,2.49\napples,kilo,1.99\n")
+        main([prices, self.path])
+        with MappedCatalog(self.path) as catalog:
+            assert catalog.unit_price(Product("rice", ProductUnit.EACH)) == 2.49
+            assert catalog.product("apples").unit == ProductUnit.KILO
+
+    def test_empty_catalog(self):
+        path = os.path.join(self.directory, "empty.smc")
+        write_catalog(path, [])
+        with MappedCatalog(path) as catalog:
+            assert len(catalog) == 0
+            assert self.products[0] not in catalog
@@ -0,0 +1,57 @@
+import pickle
+import unittest
+
+import pytest
+
+from model_objects import Discount, Product, ProductRegistry, ProductUnit
+from shopping_cart import ShoppingCart
+
+
+class ModelObjectsTest(unittest.TestCase):
+    def test_products_are_equal_by_name_and_unit(self):
+        assert Product("rice", ProductUnit.EACH) == Product("rice", ProductUnit.EACH)
+        assert hash(Product("rice", ProductUnit.EACH)) == hash(Product("rice", ProductUnit.EACH))
+        assert Product("rice", ProductUnit.EACH) != Product("rice", ProductUnit.KILO)
+
+    def test_products_leave_comparisons_with_other_types_to_them(self):
+        rice = Product("rice", ProductUnit.EACH)
+        assert rice.__eq__("rice") is NotImplemented
+        assert rice != "rice"
+
+    def test_products_are_immutable(self):
+        rice = Product("rice", ProductUnit.EACH)
+        with pytest.raises(AttributeError):
+            rice.name = "caviar"
+
+    def test_products_survive_pickling(self):
+        rice = Product("rice", ProductUnit.EACH)
+        assert pickle.loads(pickle.dumps(rice)) == rice
+
+    def test_registry_interns_products(self):
+        registry = ProductRegistry()
+        rice = registry.product("rice", ProductUnit.EACH)
+        assert registry.product("rice", ProductUnit.EACH) is rice
+        assert registry.intern(Product("rice", ProductUnit.EACH)) is rice
+        assert len(registry) == 1
+
+    def test_cart_merges_separately_loaded_products(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(Product("rice", ProductUnit.EACH), 1)
+        cart.add_item_quantity(Product("rice", ProductUnit.EACH), 2)
+        assert cart.product_quantities == {Product("rice", ProductUnit.EACH): 3}
+
+    def test_bundle_discounts_are_hashable(self):
+        products = (Product("toothbrush", ProductUnit.EACH), Product("toothpaste", ProductUnit.EACH))
+        assert hash(Discount(products, "1 Bundle", -0.28)) == hash(Discount(products, "1 Bundle", -0.28))
+
+    def test_discounts_take_amounts_and_store_cents(self):
+        rice = Product("rice", ProductUnit.EACH)
+        discount = Discount(rice, "3 for 2", -0.99)
+        assert discount.discount_cents == -99
+        assert discount.discount_amount == -0.99
+        assert Discount.from_cents(rice, "3 for 2", -99) == discount
+        assert pickle.loads(pickle.dumps(discount)) == discount
+
+    def test_discounts_from_cents_reject_amounts(self):
+        with pytest.raises(TypeError):
+            Discount.from_cents(Product("rice", ProductUnit.EACH), "3 for 2", -0.99)
@@ -0,0 +1,62 @@
+import unittest
+
+from catalog import PriceSnapshot
+from model_objects import Product, ProductUnit
+from money import divide_cents, format_cents, line_cents, to_amount, to_cents
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class MoneyTest(unittest.TestCase):
+    def test_prices_convert_to_whole_cents(self):
+        assert to_cents(0.99) == 99
+        assert to_cents(1.15) == 115
+        assert to_cents(-0.29) == -29
+
+    def test_amounts_are_always_floats(self):
+        assert to_amount(-29) == -0.29
+        assert type(to_amount(0)) is float
+
+    def test_ties_are_rounded_in_the_customers_favour(self):
+        assert divide_cents(995, 10) == 99
+        assert divide_cents(996, 10) == 100
+        assert divide_cents(-295, 10) == -30
+        assert divide_cents(-294, 10) == -29
+
+    def test_lines_are_rounded_once(self):
+        assert line_cents(3, 99) == 297
+        assert line_cents(2.5, 199) == 497
+        assert line_cents(2.3, 199) == 458
+        assert line_cents(-2.5, 199) == -497
+
+    def test_format_cents(self):
+        assert [format_cents(cents) for cents in (0, 5, -30, 497, 123456)] == ["0.00", "0.05", "-0.30", "4.97", "1234.56"]
+
+    def test_totals_are_exact_sums_of_the_lines(self):
+        catalog = FakeCatalog()
+        teller = Teller(catalog)
+        gum = Product("gum", ProductUnit.EACH)
+        catalog.add_product(gum, 0.10)
+        cart = ShoppingCart()
+        for _ in range(3):
+            cart.add_item(gum)
+        receipt = teller.checks_out_articles_from(cart)
+        assert receipt.total_price_cents() == 30
+        assert receipt.total_price() == 0.30
+
+    def test_receipt_lines_added_as_amounts_are_rounded_to_the_cent(self):
+        receipt = Receipt()
+        receipt.add_product(Product("apples", ProductUnit.KILO), 2.3, 1.99, 1.99 * 2.3)
+        assert receipt.items[0].total_price_cents == 458
+        assert receipt.total_price() == 4.58
+
+    def test_snapshots_price_counted_and_weighed_lines_in_cents(self):
+        apples, gum = Product("apples", ProductUnit.KILO), Product("gum", ProductUnit.EACH)
+        prices = PriceSnapshot({apples: 1.99, gum: 0.1})
+        assert prices.unit_price_cents(gum) == 10
+        receipt = Receipt()
+        receipt.add_cart_items_to_receipt(prices, [(gum, 3), (apples, 2.3), (apples, -2.5), (gum, 2.0)])
+        assert [item.total_price_cents for item in receipt.items] == [30, 458, -497, 20]
+        assert receipt.total_price_cents() == 11
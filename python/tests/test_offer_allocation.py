@@ -0,0 +1,105 @@
+import random
+import time
+import unittest
+
+from checkout_session import CheckoutSession
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_allocation import OfferAllocator
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class OfferAllocationTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.teller.offer_allocator = OfferAllocator()
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.catalog.add_product(self.toothpaste, 1.79)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.apples, 1.99)
+        self.the_cart = ShoppingCart()
+
+    def discounts(self, receipt):
+        return [(discount.description, discount.discount_amount) for discount in receipt.discounts]
+
+    def test_units_in_a_bundle_are_not_discounted_again(self):
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.toothpaste], 10)
+        self.the_cart.add_item_quantity(self.toothbrush, 3)
+        self.the_cart.add_item_quantity(self.toothpaste, 1)
+        receipt = self.teller.checks_out_articles_from(self.the_cart)
+        assert self.discounts(receipt) == [("3 for 2", -0.99)]
+
+    def test_left_over_units_go_to_the_next_best_offer(self):
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.toothpaste], 10)
+        self.the_cart.add_item_quantity(self.toothbrush, 4)
+        self.the_cart.add_item_quantity(self.toothpaste, 2)
+        receipt = self.teller.checks_out_articles_from(self.the_cart)
+        assert self.discounts(receipt) == [("3 for 2", -0.99), ("1 Bundle", -0.28)]
+
+    def test_percent_discount_only_covers_units_without_a_better_offer(self):
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 10)
+        self.teller.add_special_offer(SpecialOfferType.FIVE_FOR_AMOUNT, self.apples, 6.99)
+        self.the_cart.add_item_quantity(self.apples, 7)
+        receipt = self.teller.checks_out_articles_from(self.the_cart)
+        assert self.discounts(receipt) == [("10.0% off", -0.40), ("5 for 6.99", -2.96)]
+
+    def test_offers_that_do_not_compete_price_as_before(self):
+        stacked = Teller(self.catalog)
+        products = [self.toothbrush, self.toothpaste, self.apples]
+        for teller in (self.teller, stacked):
+            teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+            teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.toothpaste, 10)
+            teller.add_special_offer(SpecialOfferType.FIVE_FOR_AMOUNT, self.apples, 7.99)
+        rng = random.Random(3)
+        for _ in range(100):
+            cart = ShoppingCart()
+            for _ in range(rng.randint(0, 6)):
+                cart.add_item_quantity(rng.choice(products), rng.randint(1, 6))
+            expected = stacked.checks_out_articles_from(cart)
+            actual = self.teller.checks_out_articles_from(cart)
+            assert actual.discounts == expected.discounts
+
+    def test_out_of_time_offers_take_what_they_can_in_order(self):
+        self.teller.offer_allocator = OfferAllocator(time_budget=0)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.toothpaste], 10)
+        self.the_cart.add_item_quantity(self.toothbrush, 4)
+        self.the_cart.add_item_quantity(self.toothpaste, 2)
+        receipt = self.teller.checks_out_articles_from(self.the_cart)
+        assert receipt.total_discount_amount() == -1.27
+        assert self.teller.offer_allocator.budget_exceeded == 1
+
+    def test_large_carts_stay_close_to_the_time_budget(self):
+        # overlapping bundles over every product, an exhaustive search would take seconds
+        rng = random.Random(5)
+        products = [Product(f"product-{i}", ProductUnit.EACH) for i in range(150)]
+        for product in products:
+            self.catalog.add_product(product, round(rng.uniform(0.5, 5), 2))
+            self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, product, 0)
+        for _ in range(150):
+            self.teller.add_special_offer(SpecialOfferType.BUNDLE, rng.sample(products, 3), 10)
+        for product in products:
+            self.the_cart.add_item_quantity(product, rng.randint(1, 7))
+        self.teller.offer_allocator = OfferAllocator(time_budget=0.002)
+        start = time.perf_counter()
+        self.teller.checks_out_articles_from(self.the_cart)
+        # the budget, plus one pass over the offers that are left once it runs out
+        assert time.perf_counter() - start < 0.05
+        assert self.teller.offer_allocator.budget_exceeded == 1
+
+    def test_checkout_session_and_batch_use_the_allocator(self):
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.toothpaste], 10)
+        session = CheckoutSession(self.teller)
+        session.scan(self.toothpaste)
+        for _ in range(3):
+            session.scan(self.toothbrush)
+        expected = self.teller.checks_out_articles_from(session.cart)
+        assert session.receipt().discounts == expected.discounts
+        assert self.teller.checkout_many([session.cart]).total_prices[0] == expected.total_price()
@@ -0,0 +1,54 @@
+import pickle
+import unittest
+from enum import Enum
+
+from model_objects import Offer, Product, ProductUnit, SpecialOfferType
+from offer_rules import CompiledOffer, _rules, calculate_bulk_purchase_discount, compile_offer, offer_rule
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class CustomOfferType(Enum):
+    BUY_FOUR_GET_TWO = 1
+
+
+class OfferRulesTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.catalog.add_product(self.rice, 2.00)
+
+        @offer_rule(CustomOfferType.BUY_FOUR_GET_TWO)
+        def buy_four_get_two(offer: Offer) -> CompiledOffer:
+            return CompiledOffer(offer, "buy 4 get 2",
+                                 lambda quantity, unit_price_cents: calculate_bulk_purchase_discount(quantity, unit_price_cents, 6, 4 * unit_price_cents))
+
+    def tearDown(self):
+        del _rules[CustomOfferType.BUY_FOUR_GET_TWO]
+
+    def test_offers_are_compiled_when_added(self):
+        self.teller.add_special_offer(SpecialOfferType.TWO_FOR_AMOUNT, self.rice, 3.5)
+        offer, = self.teller.offers
+        assert offer.compiled.description == "2 for 3.5"
+        assert offer.compiled.discount_amount(5, 200) == -100
+
+    def test_built_in_compiled_offers_pickle(self):
+        for offer_type, argument in [(SpecialOfferType.THREE_FOR_TWO, 0), (SpecialOfferType.TWO_FOR_AMOUNT, 3.5),
+                                     (SpecialOfferType.FIVE_FOR_AMOUNT, 8), (SpecialOfferType.TEN_PERCENT_DISCOUNT, 10)]:
+            compiled = compile_offer(Offer(offer_type, self.rice, argument))
+            copy = pickle.loads(pickle.dumps(compiled))
+            assert copy.description == compiled.description
+            assert copy.discount_amount(5, 200) == compiled.discount_amount(5, 200)
+
+    def test_offers_without_a_rule_do_not_compile(self):
+        assert compile_offer(Offer(SpecialOfferType.BUNDLE, [self.rice], 10)) is None
+
+    def test_registered_rules_apply_at_checkout(self):
+        self.teller.add_special_offer(CustomOfferType.BUY_FOUR_GET_TWO, self.rice, 0)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.rice, 7)
+        receipt = self.teller.checks_out_articles_from(cart)
+        assert [(discount.description, discount.discount_amount) for discount in receipt.discounts] == [("buy 4 get 2", -4.0)]
+        assert self.teller.checkout_many([cart]).total_prices[0] == 10.0
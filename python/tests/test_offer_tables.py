@@ -0,0 +1,139 @@
+import pickle
+import random
+import unittest
+from math import inf
+
+from checkout_session import CheckoutSession
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_tables import OfferTable, OfferTableHistory
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+DAY = 24 * 60 * 60
+
+
+class OfferTablesTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.catalog.add_product(self.rice, 2.49)
+        self.cart = ShoppingCart()
+        self.cart.add_item_quantity(self.toothbrush, 3)
+        self.cart.add_item_quantity(self.rice, 1)
+        self.weekday = OfferTable.build(1, [(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0)], valid_from=0)
+        self.sale = OfferTable.build(2, [(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.rice, 10)], valid_from=5 * DAY, valid_until=7 * DAY)
+        self.history = OfferTableHistory()
+        self.history.publish(self.weekday)
+        self.history.publish(self.sale)
+        self.teller.offer_history = self.history
+
+    def discounts(self, receipt):
+        return [discount.description for discount in receipt.discounts]
+
+    def test_the_newest_table_in_effect_wins(self):
+        assert self.history.as_of(0) is self.weekday
+        assert self.history.as_of(5 * DAY - 1) is self.weekday
+        assert self.history.as_of(5 * DAY) is self.sale
+        assert self.history.as_of(7 * DAY) is self.weekday
+        with self.assertRaises(LookupError):
+            self.history.as_of(-1)
+
+    def test_older_versions_published_later_do_not_override(self):
+        history = OfferTableHistory()
+        history.publish(self.sale)
+        history.publish(self.weekday)
+        assert history.as_of(6 * DAY) is self.sale
+
+    def test_versions_are_looked_up_directly(self):
+        assert self.history.version(2) is self.sale
+        assert len(self.history) == 2
+        with self.assertRaises(ValueError):
+            self.history.publish(OfferTable.build(2, []))
+
+    def test_only_the_most_recent_versions_are_retained(self):
+        history = OfferTableHistory(retain=2)
+        for version in range(1, 5):
+            history.publish(OfferTable.build(version, [], valid_from=version * DAY))
+        assert len(history) == 2
+        with self.assertRaises(KeyError):
+            history.version(2)
+        with self.assertRaises(LookupError):
+            history.as_of(2 * DAY)
+        assert history.as_of(10 * DAY).version == 4
+
+    def test_the_timeline_matches_every_retained_window(self):
+        rng = random.Random(7)
+        history = OfferTableHistory(retain=20)
+        published = []
+        for version in rng.sample(range(200), 60):
+            valid_from = rng.randrange(50) * DAY
+            valid_until = rng.choice([inf, valid_from + rng.randrange(1, 20) * DAY])
+            published.append(OfferTable.build(version, [], rng.choice([-inf, valid_from]), valid_until))
+            history.publish(published[-1])
+            retained = sorted(published, key=lambda table: table.version)[-20:]
+            for timestamp in [rng.uniform(-10, 70) * DAY for _ in range(20)]:
+                expected = max((table for table in retained if table.is_valid_at(timestamp)), key=lambda table: table.version, default=None)
+                if expected is None:
+                    with self.assertRaises(LookupError):
+                        history.as_of(timestamp)
+                else:
+                    assert history.as_of(timestamp) is expected
+
+    def test_published_tables_are_immutable(self):
+        with self.assertRaises(ValueError):
+            self.sale.add(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0)
+        with self.assertRaises(TypeError):
+            del self.sale.offers[next(iter(self.sale.offers))]
+        with self.assertRaises(AttributeError):
+            self.sale.version = None
+        self.teller.swap_offer_table(self.sale)
+        with self.assertRaises(ValueError):
+            self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0)
+        with self.assertRaises(ValueError):
+            self.history.publish(OfferTable())
+
+    def test_tellers_with_tables_and_history_pickle(self):
+        self.teller.swap_offer_table(self.weekday)
+        teller = pickle.loads(pickle.dumps(self.teller))
+        assert self.discounts(teller.checks_out_articles_from(self.cart)) == ["3 for 2"]
+        assert self.discounts(teller.checks_out_articles_from(self.cart, as_of=6 * DAY)) == ["10.0% off"]
+        assert teller.offer_history.as_of(6 * DAY) is teller.offer_history.version(2)
+        teller.offer_history.publish(OfferTable.build(3, [], valid_from=6 * DAY))
+        assert self.discounts(teller.checks_out_articles_from(self.cart, as_of=6 * DAY)) == []
+        assert len(self.history) == 2
+
+    def test_carts_are_priced_as_of_a_point_in_time(self):
+        assert self.discounts(self.teller.checks_out_articles_from(self.cart, as_of=DAY)) == ["3 for 2"]
+        assert self.discounts(self.teller.checks_out_articles_from(self.cart, as_of=6 * DAY)) == ["10.0% off"]
+        # the current table is still the teller's own, empty one
+        assert self.discounts(self.teller.checks_out_articles_from(self.cart)) == []
+        result = self.teller.checkout_many([self.cart], as_of=6 * DAY)
+        assert result.total_prices[0] == self.teller.checks_out_articles_from(self.cart, as_of=6 * DAY).total_price()
+
+    def test_as_of_needs_a_history(self):
+        self.teller.offer_history = None
+        with self.assertRaises(ValueError):
+            self.teller.checks_out_articles_from(self.cart, as_of=DAY)
+
+    def test_swapping_tables(self):
+        draft = self.teller.activate_offers_as_of(6 * DAY)
+        assert self.teller.offer_table is self.sale
+        assert len(draft) == 0
+        assert self.discounts(self.teller.checks_out_articles_from(self.cart)) == ["10.0% off"]
+        assert self.teller.swap_offer_table(self.weekday) is self.sale
+        assert self.discounts(self.teller.checks_out_articles_from(self.cart)) == ["3 for 2"]
+
+    def test_checkout_sessions_keep_the_table_they_started_with(self):
+        self.teller.swap_offer_table(self.weekday)
+        session = CheckoutSession(self.teller, self.cart)
+        self.teller.swap_offer_table(self.sale)
+        session.scan(self.toothbrush)
+        assert self.discounts(session.receipt()) == ["3 for 2"]
+
+    def test_windows_must_not_be_empty(self):
+        with self.assertRaises(ValueError):
+            OfferTable(1, valid_from=DAY, valid_until=DAY)
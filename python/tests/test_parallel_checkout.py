@@ -0,0 +1,51 @@
+import multiprocessing
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from parallel_checkout import ParallelCheckout
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class ParallelCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        catalog = FakeCatalog()
+        self.teller = Teller(catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        catalog.add_product(self.toothbrush, 0.99)
+        self.rice = Product("rice", ProductUnit.EACH)
+        catalog.add_product(self.rice, 2.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.99)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.rice], 10)
+        self.carts = []
+        for i in range(40):
+            cart = ShoppingCart()
+            cart.add_item_quantity(self.toothbrush, i % 5)
+            cart.add_item_quantity(self.rice, i % 3)
+            self.carts.append(cart)
+        self.expected = [self.teller.checks_out_articles_from(cart).total_price() for cart in self.carts]
+
+    def contexts(self):
+        # spawn and forkserver pickle the teller into every worker, fork inherits it
+        for method in ("fork", "spawn", "forkserver"):
+            if method in multiprocessing.get_all_start_methods():
+                with self.subTest(start_method=method):
+                    yield multiprocessing.get_context(method)
+
+    def test_worker_pool_returns_totals_in_input_order(self):
+        for context in self.contexts():
+            runner = ParallelCheckout(self.teller, processes=2, chunk_size=3, min_parallel_carts=10, context=context)
+            assert list(runner.totals(iter(self.carts))) == self.expected
+
+    def test_worker_pool_returns_receipts(self):
+        for context in self.contexts():
+            runner = ParallelCheckout(self.teller, processes=2, chunk_size=7, min_parallel_carts=10, context=context)
+            receipts = list(runner.receipts(self.carts))
+            assert [receipt.total_price() for receipt in receipts] == self.expected
+            assert len(receipts[4].discounts) == 2
+
+    def test_small_inputs_are_checked_out_in_process(self):
+        runner = ParallelCheckout(self.teller, processes=2, min_parallel_carts=1000)
+        receipts = list(runner.receipts(self.carts))
+        assert receipts[4].discounts[0].product == self.toothbrush
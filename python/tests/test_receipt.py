@@ -0,0 +1,48 @@
+import pickle
+import unittest
+
+import pytest
+
+from model_objects import Discount, Product, ProductUnit
+from receipt import Receipt, ReceiptItem
+
+
+class ReceiptTest(unittest.TestCase):
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.receipt = Receipt()
+
+    def test_totals_follow_every_added_line(self):
+        assert self.receipt.total_price() == 0
+        self.receipt.add_product(self.toothbrush, 3, 0.99, 2.97)
+        assert self.receipt.total_price() == 2.97
+        self.receipt.add_discount(Discount(self.toothbrush, "3 for 2", -0.99))
+        self.receipt.add_discount(None)
+        assert self.receipt.total_item_price_amount() == 2.97
+        assert self.receipt.total_discount_amount() == -0.99
+        assert self.receipt.total_price() == 1.98
+
+    def test_items_are_a_read_only_live_view(self):
+        items = self.receipt.items
+        self.receipt.add_product(self.toothbrush, 1, 0.99, 0.99)
+        assert len(items) == 1
+        assert items[0].product == self.toothbrush
+        with pytest.raises(TypeError):
+            items[0] = None
+        assert not hasattr(items, 'append')
+
+    def test_items_are_built_from_amounts_or_whole_cents(self):
+        apples = Product("apples", ProductUnit.KILO)
+        item = ReceiptItem(apples, 2.3, 1.99, 1.99 * 2.3)
+        assert (item.price_cents, item.total_price_cents) == (199, 458)
+        assert ReceiptItem.from_cents(apples, 2.3, 199, 458) == item
+        assert item.total_price == 4.58
+        with pytest.raises(TypeError):
+            ReceiptItem.from_cents(apples, 2.3, 1.99, 4.58)
+        assert pickle.loads(pickle.dumps(item)) == item
+
+    def test_items_compare_like_a_list(self):
+        self.receipt.add_product(self.toothbrush, 1, 0.99, 0.99)
+        assert self.receipt.items == [ReceiptItem(self.toothbrush, 1, 0.99, 0.99)]
+        assert self.receipt.items != []
+        assert self.receipt.discounts == ()
@@ -0,0 +1,145 @@
+import random
+import sys
+import unittest
+from unittest import mock
+
+from model_objects import Discount, Product, ProductRegistry, ProductUnit, SpecialOfferType
+from receipt import Receipt
+from receipt_codec import FLOAT_QUANTITIES, WIDE_AMOUNTS, EncodedReceipt, ReceiptBatch, ReceiptEncoder, encode_receipts
+from receipt_printer import ReceiptPrinter, TextReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class ReceiptCodecTest(unittest.TestCase):
+    def setUp(self):
+        catalog = FakeCatalog()
+        self.teller = Teller(catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        catalog.add_product(self.toothbrush, 0.99)
+        self.apples = Product("äpples", ProductUnit.KILO)
+        catalog.add_product(self.apples, 1.99)
+        self.rice = Product("rice", ProductUnit.EACH)
+        catalog.add_product(self.rice, 2.49)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 10)
+        self.teller.add_special_offer(SpecialOfferType.BUNDLE, [self.toothbrush, self.rice], 10)
+        rng = random.Random(5)
+        self.receipts = [Receipt()]
+        for _ in range(20):
+            cart = ShoppingCart()
+            for product in rng.sample([self.toothbrush, self.apples, self.rice], rng.randint(1, 3)):
+                cart.add_item_quantity(product, round(rng.uniform(0.1, 3), 3) if product.unit == ProductUnit.KILO else rng.randint(1, 5))
+            self.receipts.append(self.teller.checks_out_articles_from(cart))
+
+    def assert_same_receipt(self, decoded: EncodedReceipt, receipt: Receipt):
+        assert decoded.items == receipt.items
+        assert [type(item.quantity) for item in decoded.items] == [type(item.quantity) for item in receipt.items]
+        assert decoded.discounts == receipt.discounts
+        assert decoded.total_price_cents() == receipt.total_price_cents()
+        assert decoded.total_item_price_cents() == receipt.total_item_price_cents()
+        assert decoded.total_discount_cents() == receipt.total_discount_cents()
+
+    def test_round_trip(self):
+        batch = ReceiptBatch(encode_receipts(self.receipts))
+        assert len(batch) == len(self.receipts)
+        for decoded, receipt in zip(batch, self.receipts):
+            self.assert_same_receipt(decoded, receipt)
+        assert any(isinstance(discount.product, tuple) for receipt in self.receipts for discount in receipt.discounts)
+
+    def test_totals_are_read_without_decoding_lines(self):
+        batch = ReceiptBatch(encode_receipts(self.receipts))
+        assert list(batch.total_prices_cents()) == [receipt.total_price_cents() for receipt in self.receipts]
+        assert batch[-1].total_price() == self.receipts[-1].total_price()
+
+    def test_lines_decode_one_at_a_time(self):
+        decoded = ReceiptBatch(encode_receipts(self.receipts))[5]
+        assert decoded.items[-1] == self.receipts[5].items[-1]
+        assert decoded.items[1:] == list(self.receipts[5].items[1:])
+        with self.assertRaises(IndexError):
+            decoded.items[len(self.receipts[5].items)]
+
+    def test_products_and_descriptions_are_interned_per_batch(self):
+        batch = ReceiptBatch(encode_receipts(self.receipts))
+        assert sorted(product.name for product in batch.products) == ["rice", "toothbrush", "äpples"]
+        assert len(batch.descriptions) == len({discount.description for receipt in self.receipts for discount in receipt.discounts})
+
+    def test_decoded_products_are_interned_in_the_registry(self):
+        registry = ProductRegistry()
+        rice = registry.intern(Product("rice", ProductUnit.EACH))
+        batch = ReceiptBatch(encode_receipts(self.receipts), registry)
+        assert any(product is rice for product in batch.products)
+
+    def test_printers_accept_encoded_receipts(self):
+        decoded = ReceiptBatch(encode_receipts(self.receipts))[3]
+        assert TextReceiptPrinter().print_receipt(decoded) == TextReceiptPrinter().print_receipt(self.receipts[3])
+        assert ReceiptPrinter().print_receipt(decoded) == ReceiptPrinter().print_receipt(self.receipts[3])
+
+    def test_to_receipt(self):
+        receipt = ReceiptBatch(encode_receipts(self.receipts))[7].to_receipt()
+        self.assert_same_receipt(ReceiptBatch(encode_receipts([receipt]))[0], self.receipts[7])
+
+    def test_unusual_quantities_and_huge_amounts_round_trip(self):
+        receipt = Receipt()
+        receipt.add_product(self.apples, 1 / 3, 1.99, 1.99 / 3)
+        receipt.add_product(self.rice, 1.0, 30_000_000.0, 30_000_000.0)
+        receipt.add_discount(Discount.from_cents(self.rice, "goodwill", -2**40))
+        decoded = ReceiptBatch(encode_receipts([receipt]))[0]
+        assert decoded._flags == FLOAT_QUANTITIES | WIDE_AMOUNTS
+        self.assert_same_receipt(decoded, receipt)
+
+    def test_the_encoder_starts_a_new_batch_after_finishing(self):
+        encoder = ReceiptEncoder()
+        encoder.add_all(self.receipts[:3])
+        first = encoder.finish()
+        assert len(encoder) == 0
+        encoder.add(self.receipts[3])
+        second = ReceiptBatch(encoder.finish())
+        assert len(ReceiptBatch(first)) == 3
+        assert len(second) == 1
+        self.assert_same_receipt(second[0], self.receipts[3])
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(ValueError):
+            ReceiptBatch(b"<html>" + bytes(20))
+        batch = bytearray(encode_receipts(self.receipts))
+        batch[4] = 99
+        with self.assertRaises(ValueError):
+            ReceiptBatch(batch)
+
+    def test_truncated_batches_are_rejected(self):
+        batch = encode_receipts(self.receipts)
+        for length in range(0, len(batch), 7):
+            with self.assertRaises(ValueError):
+                ReceiptBatch(batch[:length])
+
+    def test_corrupt_batches_only_raise_value_errors(self):
+        batch = encode_receipts(self.receipts)
+        rng = random.Random(3)
+        for _ in range(300):
+            corrupt = bytearray(batch)
+            for _ in range(3):
+                corrupt[rng.randrange(len(corrupt))] = rng.randrange(256)
+            try:
+                decoded = ReceiptBatch(corrupt)
+                list(decoded.total_prices_cents())
+                for receipt in decoded:
+                    list(receipt.items)
+                    list(receipt.discounts)
+            except ValueError:
+                pass
+
+    def test_big_endian_hosts_are_refused(self):
+        batch = encode_receipts(self.receipts)
+        with mock.patch.object(sys, 'byteorder', 'big'):
+            with self.assertRaises(NotImplementedError):
+                ReceiptBatch(batch)
+            with self.assertRaises(NotImplementedError):
+                ReceiptEncoder()
+
+    def test_names_too_long_for_the_format_are_rejected(self):
+        receipt = Receipt()
+        receipt.add_product(Product("x" * 70_000, ProductUnit.EACH), 1, 1.0, 1.0)
+        with self.assertRaises(ValueError):
+            encode_receipts([receipt])
@@ -1,11 +1,17 @@
+import os
 import unittest
 
 from approvaltests.approvals import verify
 from approvaltests.core.options import Options
 
-from model_objects import Product, ProductUnit, Discount
+from model_objects import Product, ProductUnit, Discount, SpecialOfferType
 from receipt import Receipt
-from receipt_printer import ReceiptPrinter
+from receipt_printer import ReceiptPrinter, TextReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+TEXTTEST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'texttest')
 
 
 class ReceiptPrinterTest(unittest.TestCase):
@@ -44,3 +50,45 @@ class ReceiptPrinterTest(unittest.TestCase):
         self.receipt.add_product(self.apples, 0.75, 1.99, 1.99 * 0.75)
         self.receipt.add_discount(Discount(self.apples, "3 for 2", -0.99))
         self.compare_with_html(self.receipt)
+
+    def test_template_is_compiled_once(self):
+        assert ReceiptPrinter().template is ReceiptPrinter().template
+
+
+class TextReceiptPrinterTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.products = {}
+        for name, unit, price in [("toothbrush", ProductUnit.EACH, 0.99), ("apples", ProductUnit.KILO, 1.99),
+                                  ("rice", ProductUnit.EACH, 2.99), ("cherry tomato box", ProductUnit.EACH, 0.69)]:
+            self.products[name] = Product(name, unit)
+            self.catalog.add_product(self.products[name], price)
+
+    def verify_texttest(self, name: str, cart: list[tuple[str, float]], offers: list[tuple[str, SpecialOfferType, float]]):
+        the_cart = ShoppingCart()
+        for product, quantity in cart:
+            the_cart.add_item_quantity(self.products[product], quantity)
+        for product, offer_type, argument in offers:
+            self.teller.add_special_offer(offer_type, self.products[product], argument)
+        receipt = self.teller.checks_out_articles_from(the_cart)
+        with open(os.path.join(TEXTTEST_DIR, name, 'stdout.sr'), encoding='utf-8') as expected:
+            assert TextReceiptPrinter().print_receipt(receipt) + '\n' == expected.read()
+
+    def test_empty_cart(self):
+        self.verify_texttest('empty_cart', [], [])
+
+    def test_multiple_items(self):
+        self.verify_texttest('multiple_items', [("toothbrush", 1.0), ("rice", 1.0)], [])
+
+    def test_loose_weight_product(self):
+        self.verify_texttest('loose_weight_product', [("apples", 2.5)], [])
+
+    def test_buy_two_get_one_free(self):
+        self.verify_texttest('buy_two_get_one_free', [("toothbrush", 3.0)], [("toothbrush", SpecialOfferType.THREE_FOR_TWO, 0.99)])
+
+    def test_two_for_y_discount(self):
+        self.verify_texttest('two_for_y_discount', [("cherry tomato box", 2.0)], [("cherry tomato box", SpecialOfferType.TWO_FOR_AMOUNT, 0.99)])
+
+    def test_five_for_y_discount_with_sixteen(self):
+        self.verify_texttest('five_for_y_discount_with_sixteen', [("apples", 16.0)], [("apples", SpecialOfferType.FIVE_FOR_AMOUNT, 5.99)])